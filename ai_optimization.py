@@ -1,11 +1,12 @@
 import pennylane as qml
+from pennylane import numpy as pnp
 import numpy as np
-import networkx as nx
 from sklearn.svm import SVC
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import accuracy_score
 import time
 import random
+from metrics import timed, observe, inc
 
 # 🎯 Generate parking graph
 def generate_parking_graph(slot_list, entry_node="Entry", exit_node="Exit"):
@@ -16,6 +17,7 @@ def generate_parking_graph(slot_list, entry_node="Entry", exit_node="Exit"):
     return graph
 
 # 🧠 Simple real-world allocation based on weights
+@timed("parkour_allocator_seconds", allocator="weighted")
 def real_world_allocate(slots, vehicle_type):
     weights = {
         'compact_car': 1.0,
@@ -34,49 +36,120 @@ def real_world_allocate(slots, vehicle_type):
     return best_slot
 
 # 💠 QAOA Optimization
-def qaoa_optimize(slots):
-    G = nx.Graph()
-    for i in range(len(slots)):
-        for j in range(i + 1, len(slots)):
-            G.add_edge(i, j)
+MAX_QAOA_WIRES = 10       # statevector simulation beyond this is no longer "small"
+QAOA_MAX_STEPS = 60
+QAOA_TOL = 1e-3
+QAOA_STEPSIZE = 0.1
+QAOA_READOUT = 8
 
-    n_wires = len(slots)
-    dev = qml.device("default.qubit", wires=n_wires)
+# One device + QNode per (wires, depth), and the last optimized (γ, β) per problem size
+_qaoa_circuits = {}
+_qaoa_params = {}
 
-    def cost_layer(gamma):
-        for (i, j) in G.edges:
-            qml.CNOT(wires=[i, j])
-            qml.RZ(-gamma, wires=j)
-            qml.CNOT(wires=[i, j])
+# Feature weights: metres of spare room, floors away from the entry, EV bay taken by a non-EV
+SLACK_WEIGHT = 1.0
+LEVEL_WEIGHT = 0.5
+EV_BAY_WEIGHT = 1.0
 
-    def mixer_layer(beta):
-        for i in range(n_wires):
-            qml.RX(2 * beta, wires=i)
+def slot_feature_costs(slots, car_dims=None, is_ev=False):
+    # Cost per slot from the slot table: dimension slack + level + type; None if a slot is unknown
+    from slot_utils import load_slot_store, CAR_DIMENSIONS
+    store = load_slot_store()
+    if any(store.shard_of(s) is None for s in slots):
+        return None
+    car_dims = car_dims or CAR_DIMENSIONS["Compact"]
+    needed = np.array([car_dims["length"], car_dims["width"], car_dims["height"]])
+    dims = np.array([store.dims_of(s) for s in slots], dtype=float)
+    slack = np.clip(dims - needed, 0, None).sum(axis=1)
+    levels = store.levels()
+    level_rank = np.array([levels.index(store.level_of(s)) for s in slots])
+    ev_bay = np.array([str(store.type_of(s)).lower() == "electric" for s in slots])
+    return SLACK_WEIGHT * slack + LEVEL_WEIGHT * level_rank + EV_BAY_WEIGHT * (ev_bay & (not is_ev))
 
-    @qml.qnode(dev)
-    def circuit(gamma, beta):
-        for i in range(n_wires):
-            qml.Hadamard(wires=i)
-        cost_layer(gamma)
-        mixer_layer(beta)
-        return qml.probs(wires=range(n_wires))
-
-    def qaoa_objective(params):
-        gamma, beta = params
-        probs = circuit(gamma, beta)
-        return -np.sum(probs)
-
-    opt = qml.GradientDescentOptimizer(stepsize=0.1)
-    params = np.array([0.5, 0.5])
-    for _ in range(10):
-        params = opt.step(qaoa_objective, params)
-
-    final_probs = circuit(*params)
-    best_index = np.argmax(final_probs)
-    best_bitstring = format(best_index, f"0{n_wires}b")
-
-    selected_slots = [slot for bit, slot in zip(best_bitstring, slots) if bit == '1']
-    return selected_slots
+def slot_path_costs(slots, entry_node="Entry", exit_node="Exit"):
+    # Entry -> slot -> exit walking distance from the parking graph
+    graph = generate_parking_graph(slots, entry_node, exit_node)
+    return np.array([graph[entry_node][s] + graph[s][exit_node] for s in slots], dtype=float)
+
+def qaoa_cost_diagonal(costs, k=1, penalty=2.0):
+    # Cost Hamiltonian C(x) = Σ c_i x_i + A (Σ x_i - k)² is diagonal in the computational
+    # basis, so it is kept as its 2^n eigenvalues (wire 0 = most significant bit)
+    costs = np.asarray(costs, dtype=float)
+    n = len(costs)
+    bits = (np.arange(2 ** n)[:, None] >> np.arange(n - 1, -1, -1)) & 1
+    return bits @ costs + penalty * (bits.sum(axis=1) - k) ** 2, bits
+
+def _qaoa_circuit(n_wires, depth):
+    key = (n_wires, depth)
+    if key not in _qaoa_circuits:
+        dev = qml.device("default.qubit", wires=n_wires)
+
+        @qml.qnode(dev, diff_method="backprop")
+        def circuit(params, energies):
+            for i in range(n_wires):
+                qml.Hadamard(wires=i)
+            for gamma, beta in params:
+                qml.DiagonalQubitUnitary(pnp.exp(-1j * gamma * energies), wires=range(n_wires))
+                for i in range(n_wires):
+                    qml.RX(2 * beta, wires=i)
+            return qml.probs(wires=range(n_wires))
+
+        _qaoa_circuits[key] = circuit
+    return _qaoa_circuits[key]
+
+@timed("parkour_allocator_seconds", allocator="qaoa")
+def qaoa_optimize(slots, costs=None, k=1, depth=1, max_steps=QAOA_MAX_STEPS, tol=QAOA_TOL):
+    slots = list(slots)
+    if not slots:
+        return []
+    if costs is None:
+        costs = slot_feature_costs(slots)
+        costs = slot_path_costs(slots) if costs is None else costs
+    costs = np.asarray(costs, dtype=float)
+    k = max(1, min(k, len(slots)))
+
+    # Large inputs: QAOA only arbitrates between the cheapest candidates
+    order = np.argsort(costs, kind="stable")[:max(MAX_QAOA_WIRES, k)]
+    if len(order) > MAX_QAOA_WIRES:
+        return [slots[i] for i in order[:k]]  # more picks than wires: greedy is exact anyway
+    candidates = [slots[i] for i in order]
+    n_wires = len(candidates)
+
+    # Scale costs to [0, 1] so stored angles transfer between instances of the same size
+    c = costs[order]
+    c = (c - c.min()) / (np.ptp(c) or 1.0)
+    energies, bits = qaoa_cost_diagonal(c, k)
+    energies = energies / (energies.max() or 1.0)
+    circuit = _qaoa_circuit(n_wires, depth)
+
+    def objective(params):
+        return pnp.dot(circuit(params, energies), energies)
+
+    key = (n_wires, k, depth)
+    params = pnp.array(_qaoa_params.get(key, [[0.5, 0.5]] * depth), requires_grad=True)
+    opt = qml.AdamOptimizer(stepsize=QAOA_STEPSIZE)
+    previous, steps = None, 0
+    for steps in range(1, max_steps + 1):
+        params, energy = opt.step_and_cost(objective, params)
+        if previous is not None and abs(previous - energy) < tol:
+            break
+        previous = energy
+    _qaoa_params[key] = np.asarray(params).tolist()
+    observe("parkour_qaoa_steps", steps, wires=n_wires)
+
+    # Read out like a sampler would: the cheapest of the most likely bitstrings
+    probs = np.asarray(circuit(params, energies))
+    likely = np.argsort(probs)[::-1][:QAOA_READOUT]
+    best = bits[likely[int(np.argmin(energies[likely]))]]
+    # Repair an off-by-some readout: keep the cheapest picks, top up with the cheapest free slots
+    ranked = np.argsort(c, kind="stable")
+    selected = [i for i in ranked if best[i]][:k]
+    selected += [i for i in ranked if not best[i]][:k - len(selected)]
+    # Linear cost + cardinality: the k cheapest slots are the exact optimum, never return worse
+    if c[selected].sum() > c[ranked[:k]].sum():
+        inc("parkour_qaoa_fallbacks_total", wires=n_wires)
+        selected = list(ranked[:k])
+    return [candidates[i] for i in sorted(selected, key=lambda i: c[i])]
 
 # ✅ Fixed QSVM using Fidelity Kernel
 def qsvm_slot_classifier(vehicle_types, labels):
@@ -141,7 +214,7 @@ def run_classical_optimizer(slots_count, vehicle_count):
 def run_qaoa_optimizer(slots_count, vehicle_count):
     slots = [f"SLOT{i+1}" for i in range(slots_count)]
     start = time.time()
-    assigned_slots = qaoa_optimize(slots)
+    assigned_slots = qaoa_optimize(slots, k=vehicle_count)
     assigned = assigned_slots[:min(vehicle_count, len(assigned_slots))]
     end = time.time()
     efficiency = len(set(assigned)) / slots_count
@@ -0,0 +1,208 @@
+import json
+import time
+import queue
+import threading
+import socketserver
+import numpy as np
+from metrics import inc
+
+OCCUPY, RELEASE, RESET, SNAPSHOT = "occupy", "release", "reset", "snapshot"
+FEED_HOST = "127.0.0.1"
+FEED_PORT = 8765
+
+def _table_counts(table):
+    # {(level, type): free} for every level/type combination in the table
+    if hasattr(table, "shards"):
+        # Sharded store: sum the per-shard tables (sites share level/type keys)
+        counts = {}
+        for shard in table.shards.values():
+            with shard.lock:
+                for key, n in _table_counts(shard.table).items():
+                    counts[key] = counts.get(key, 0) + n
+        return counts
+    n_types = max(len(table.types), 1)
+    mask = table.available_mask()
+    combined = table.level_codes.astype(np.int32) * n_types + table.type_codes
+    present = np.unique(combined)
+    free = np.bincount(combined[mask], minlength=int(present.max(initial=0)) + 1)
+    return {(table.levels[c // n_types], table.types[c % n_types]): int(free[c]) for c in present}
+
+# 📣 Availability change feed: free counts are kept per (level, type) and every
+# occupy/release is pushed as a delta, so screens never re-read the slot CSV.
+class AvailabilityFeed:
+    def __init__(self):
+        self.seq = 0
+        self.total = 0
+        self.seeded = False
+        self._free = {}
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.RLock()
+
+    def _counts_payload(self):
+        counts = {}
+        for (level, slot_type), n in self._free.items():
+            counts.setdefault(level, {})[slot_type] = n
+        return counts
+
+    def _dispatch(self, event):
+        # Runs under the lock so every subscriber sees events in seq order; callbacks must be cheap
+        for token, callback in list(self._subscribers.items()):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"⚠️ Dropping availability subscriber {token}: {e}")
+                self._subscribers.pop(token, None)
+
+    def _snapshot_event(self, kind):
+        return {"seq": self.seq, "ts": time.time(), "event": kind,
+                "counts": self._counts_payload(), "total": self.total}
+
+    def reset(self, table):
+        with self._lock:
+            self._free = _table_counts(table)
+            self.total = sum(self._free.values())
+            self.seeded = True
+            self.seq += 1
+            self._dispatch(self._snapshot_event(RESET))
+        inc("parkour_feed_events_total", event=RESET)
+
+    def publish(self, kind, slot_id, level, slot_type):
+        if kind not in (OCCUPY, RELEASE):
+            raise ValueError(f"Unknown availability event: {kind}")
+        with self._lock:
+            if not self.seeded:
+                return None
+            delta = -1 if kind == OCCUPY else 1
+            key = (level, slot_type)
+            self._free[key] = self._free.get(key, 0) + delta
+            self.total += delta
+            self.seq += 1
+            event = {"seq": self.seq, "ts": time.time(), "event": kind, "slot": slot_id,
+                     "level": level, "type": slot_type, "free": self._free[key], "total": self.total}
+            self._dispatch(event)
+        inc("parkour_feed_events_total", event=kind)
+        return event
+
+    def subscribe(self, callback, replay=True):
+        # New subscribers get the current counts first, then deltas
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = callback
+            if replay and self.seeded:
+                callback(self._snapshot_event(SNAPSHOT))
+        return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            return self._subscribers.pop(token, None) is not None
+
+    def free_count(self, level=None, slot_type=None):
+        with self._lock:
+            return sum(
+                n for (l, t), n in self._free.items()
+                if (level is None or l == level) and (slot_type is None or t == slot_type)
+            )
+
+    def free_counts(self):
+        with self._lock:
+            return dict(self._free)
+
+    def __len__(self):
+        return len(self._subscribers)
+
+FEED = AvailabilityFeed()
+
+# ==================== LOCAL SOCKET ====================
+# Newline-delimited JSON over TCP on localhost: one snapshot line, then one line per delta.
+class _FeedHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        events = queue.Queue(maxsize=self.server.max_backlog)
+        dropped = threading.Event()
+
+        def push(event):
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                dropped.set()  # slow screen: cut it loose rather than stall the publisher
+
+        token = self.server.feed.subscribe(push)
+        try:
+            while not dropped.is_set():
+                try:
+                    event = events.get(timeout=1)
+                except queue.Empty:
+                    continue
+                self.wfile.write(json.dumps(event).encode() + b"\n")
+                self.wfile.flush()
+        except OSError:
+            pass
+        finally:
+            self.server.feed.unsubscribe(token)
+
+class FeedServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, feed=FEED, host=FEED_HOST, port=FEED_PORT, max_backlog=1000):
+        self.feed = feed
+        self.max_backlog = max_backlog
+        super().__init__((host, port), _FeedHandler)
+
+def serve_feed(feed=FEED, host=FEED_HOST, port=FEED_PORT):
+    # Starts the socket feed on a daemon thread; call .shutdown() on the result to stop it
+    server = FeedServer(feed, host, port)
+    threading.Thread(target=server.serve_forever, name="availability-feed", daemon=True).start()
+    print(f"📣 Availability feed on {host}:{server.server_address[1]}")
+    return server
+
+# 🧪 Benchmark: many screens following churn, push vs re-reading the table per screen
+def benchmark_feed(n_slots=50_000, n_screens=200, n_events=20_000, seed=9):
+    import pandas as pd
+    from slot_store import SlotTable, AVAILABLE, OCCUPIED
+    rng = np.random.default_rng(seed)
+    table = SlotTable.from_dataframe(pd.DataFrame({
+        "Slot_ID": [f"SLOT{i + 1}" for i in range(n_slots)],
+        "Level": rng.choice(["L1", "L2", "L3"], n_slots),
+        "Type": rng.choice(["Normal", "Electric"], n_slots, p=[0.8, 0.2]),
+        "Status": AVAILABLE,
+        "Vehicle": None,
+        "User_ID": None,
+        "Max_Length": 5.0,
+        "Max_Width": 2.2,
+        "Max_Height": 2.0
+    }))
+    feed = AvailabilityFeed()
+    feed.reset(table)
+    screens = [{} for _ in range(n_screens)]
+    for screen in screens:
+        feed.subscribe(lambda e, s=screen: s.__setitem__(e.get("level"), e.get("free")))
+
+    rows = rng.integers(0, n_slots, n_events)
+    start = time.perf_counter()
+    for i, row in enumerate(rows):
+        slot_id = str(table.ids[row])
+        occupy = table.status_of(slot_id) == AVAILABLE
+        table.set_slot(slot_id, OCCUPIED if occupy else AVAILABLE, f"V{i}" if occupy else "", "")
+        feed.publish(OCCUPY if occupy else RELEASE, slot_id, table.level_of(slot_id), table.type_of(slot_id))
+    push_elapsed = time.perf_counter() - start
+
+    polls = min(n_events, 200)
+    start = time.perf_counter()
+    for _ in range(polls):
+        for _ in range(n_screens):
+            _table_counts(table)
+    poll_elapsed = (time.perf_counter() - start) / polls * n_events
+
+    return {
+        "slots": n_slots,
+        "screens": n_screens,
+        "events": n_events,
+        "consistent": feed.free_counts() == _table_counts(table),
+        "push_us_per_event": round(push_elapsed / n_events * 1e6, 1),
+        "poll_us_per_event": round(poll_elapsed / n_events * 1e6, 1)
+    }
+
+if __name__ == "__main__":
+    print(benchmark_feed())
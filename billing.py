@@ -0,0 +1,168 @@
+import os
+import numpy as np
+import pandas as pd
+import time
+
+# 💰 Canonical tariff table (hourly base rate per role, in ₹)
+ROLE_RATE = {
+    "official": 30,
+    "worker": 40,
+    "intern": 50,
+    "user": 60,
+    "guest": 70
+}
+
+# ⏳ Free minutes before a session is charged at all
+GRACE_MINUTES = {
+    "official": 15,
+    "worker": 15,
+    "intern": 10,
+    "user": 10,
+    "guest": 5
+}
+
+# 🕒 Time-of-day bands: (start, end, multiplier on the base rate)
+TIME_BANDS = [
+    ("00:00", "06:00", 0.5),   # 🌙 Night
+    ("06:00", "09:00", 1.0),   # 🌅 Morning
+    ("09:00", "18:00", 1.25),  # ☀️ Peak
+    ("18:00", "21:00", 1.0),   # 🌆 Evening
+    ("21:00", "24:00", 0.5)    # 🌙 Night
+]
+
+DEFAULT_ROLE = "user"
+SLOT_CSV = "updated_parking_slots_with_dimensions.csv"
+
+def _to_minute(hhmm):
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+def _build_band_tables(bands):
+    per_minute = np.zeros(1440, dtype=np.float64)
+    for start, end, multiplier in bands:
+        per_minute[_to_minute(start):_to_minute(end)] = multiplier
+    cumulative = np.concatenate(([0.0], np.cumsum(per_minute)))
+    return per_minute, cumulative
+
+_BAND_RATE, _BAND_CUM = _build_band_tables(TIME_BANDS)
+_DAY_WEIGHT = _BAND_CUM[-1]
+
+def _to_epoch_seconds(values):
+    stamps = np.asarray(values)
+    if stamps.dtype.kind != "M":
+        # Strings / datetimes; blanks and "nan" from CSVs become NaT
+        parsed = pd.to_datetime(stamps.ravel(), errors="coerce")
+        stamps = parsed.to_numpy(dtype="datetime64[ns]").reshape(stamps.shape)
+    stamps = stamps.astype("datetime64[s]")
+    valid = ~np.isnat(stamps)
+    return stamps.astype(np.int64), valid
+
+def _weighted_minutes(seconds):
+    # Band-weighted minutes since the epoch, so a session costs F(end) - F(start)
+    days, second_of_day = np.divmod(seconds, 86400)
+    minute, second = np.divmod(second_of_day, 60)
+    return days * _DAY_WEIGHT + _BAND_CUM[minute] + (second / 60.0) * _BAND_RATE[minute]
+
+def _role_lookup(roles, table):
+    roles = np.char.lower(np.char.strip(np.asarray(roles, dtype=str)))
+    unique_roles, inverse = np.unique(roles, return_inverse=True)
+    values = np.array([table.get(r, table[DEFAULT_ROLE]) for r in unique_roles], dtype=np.float64)
+    return values[inverse.reshape(roles.shape)]
+
+def _priced_roles(roles):
+    # Report each session under the role it was actually billed as (unknown roles → DEFAULT_ROLE)
+    roles = np.char.lower(np.char.strip(np.asarray(roles, dtype=str)))
+    unique_roles, inverse = np.unique(roles, return_inverse=True)
+    priced = np.array([r if r in ROLE_RATE else DEFAULT_ROLE for r in unique_roles], dtype=str)
+    return priced[inverse.reshape(roles.shape)]
+
+def price_sessions(check_in, check_out, roles):
+    start, start_ok = _to_epoch_seconds(check_in)
+    end, end_ok = _to_epoch_seconds(check_out)
+    roles = np.broadcast_to(np.asarray(roles, dtype=str), start.shape)
+
+    valid = start_ok & end_ok & (end > start)
+    start = np.where(valid, start, 0)
+    end = np.where(valid, end, 0)
+
+    duration_minutes = (end - start) / 60.0
+    weighted = _weighted_minutes(end) - _weighted_minutes(start)
+    rates = _role_lookup(roles, ROLE_RATE)
+    grace = _role_lookup(roles, GRACE_MINUTES)
+
+    bills = (weighted / 60.0) * rates
+    bills[~valid | (duration_minutes <= grace)] = 0.0
+    return np.round(bills, 2)
+
+def price_session(check_in, check_out, role=DEFAULT_ROLE):
+    return float(price_sessions([check_in], [check_out], [role])[0])
+
+def _summarize(keys, bills, label):
+    keys = np.asarray(keys, dtype=str)
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=bills, minlength=len(unique_keys))
+    counts = np.bincount(inverse, minlength=len(unique_keys))
+    return pd.DataFrame({
+        label: unique_keys,
+        "Sessions": counts,
+        "Revenue": np.round(totals, 2),
+        "Avg_Bill": np.round(totals / np.maximum(counts, 1), 2)
+    })
+
+def settle_sessions(check_in, check_out, roles, levels):
+    bills = price_sessions(check_in, check_out, roles)
+    roles = _priced_roles(roles)
+    return {
+        "bills": bills,
+        "by_level": _summarize(levels, bills, "Level"),
+        "by_role": _summarize(roles, bills, "Role"),
+        "total": round(float(bills.sum()), 2)
+    }
+
+# 🌙 Nightly settlement over a bookings CSV (e.g. the extended user dataset)
+def _slot_levels(slots, slot_csv):
+    # Booked slot → Level via the slot table; unbooked or unknown slots stay "Unknown"
+    slots = pd.Series(slots, dtype=object)
+    if not os.path.exists(slot_csv):
+        return np.full(len(slots), "Unknown")
+    table = pd.read_csv(slot_csv, usecols=["Slot_ID", "Level"])
+    by_slot = pd.Series(table["Level"].to_numpy(dtype=str), index=table["Slot_ID"].astype(str))
+    return slots.map(by_slot).fillna("Unknown").to_numpy(dtype=str)
+
+def run_nightly_settlement(csv_path, start_col="Booking_Start", end_col="Booking_End",
+                           role_col="Role", level_col=None, slot_col="Prebooked_Slot", slot_csv=SLOT_CSV):
+    df = pd.read_csv(csv_path, usecols=lambda c: c in {start_col, end_col, role_col, level_col, slot_col})
+    if level_col in df.columns:
+        levels = df[level_col].fillna("Unknown").to_numpy(dtype=str)
+    elif slot_col in df.columns:
+        levels = _slot_levels(df[slot_col].astype(str).str.strip(), slot_csv)
+    else:
+        levels = np.full(len(df), "Unknown")
+    return settle_sessions(
+        df[start_col].to_numpy(dtype=str),
+        df[end_col].to_numpy(dtype=str),
+        df[role_col].fillna(DEFAULT_ROLE).to_numpy(dtype=str),
+        levels
+    )
+
+# 🧪 Benchmark: price a large synthetic batch
+def benchmark_settlement(n_sessions=1_000_000, seed=42):
+    rng = np.random.default_rng(seed)
+    base = np.datetime64("2025-04-01T00:00:00")
+    check_in = base + rng.integers(0, 86400, n_sessions).astype("timedelta64[s]")
+    check_out = check_in + rng.integers(60, 8 * 3600, n_sessions).astype("timedelta64[s]")
+    roles = rng.choice(list(ROLE_RATE.keys()), n_sessions)
+    levels = rng.choice(["L1", "L2", "L3"], n_sessions)
+
+    start = time.time()
+    summary = settle_sessions(check_in, check_out, roles, levels)
+    end = time.time()
+    return {
+        "sessions": n_sessions,
+        "total": summary["total"],
+        "time": round(end - start, 4)
+    }
+
+if __name__ == "__main__":
+    print(price_session("2025-04-02 08:00:00", "2025-04-02 10:30:00", "user"))
+    print(benchmark_settlement())
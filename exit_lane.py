@@ -0,0 +1,114 @@
+import os
+import time
+from datetime import datetime
+from billing import price_session, DEFAULT_ROLE
+from plate_registry import normalize_plate, resolve_reads
+from qr_generator import resolve_qr, close_booking
+from slot_utils import load_slot_store, update_slot, flush_slot_writes, USER_CSV
+from slot_store import AVAILABLE, OCCUPIED
+from metrics import timed, inc, read_csv
+
+# 👤 User_ID -> role, rebuilt only when the user CSV changes
+_roles = {"mtime": None, "by_user": {}}
+
+def _role_of(user_id):
+    if str(user_id).startswith("guest_"):
+        return "guest"
+    if os.path.exists(USER_CSV):
+        mtime = os.stat(USER_CSV).st_mtime_ns
+        if _roles["mtime"] != mtime:
+            df = read_csv(USER_CSV, usecols=["User_ID", "Role"])
+            _roles["by_user"] = dict(zip(df["User_ID"], df["Role"].fillna(DEFAULT_ROLE)))
+            _roles["mtime"] = mtime
+    return str(_roles["by_user"].get(user_id, DEFAULT_ROLE)).lower()
+
+def resolve_vehicle(read):
+    # read: plate text, a list of OCR candidates, or a QR payload -> (vehicle, slot_id)
+    store = load_slot_store()
+    reads = [r for r in (read if isinstance(read, (list, tuple)) else [read]) if r]
+    for r in reads:
+        booking = resolve_qr(str(r))
+        if booking and store.find_vehicle(booking["Vehicle"]):
+            return booking["Vehicle"], store.find_vehicle(booking["Vehicle"])
+        for candidate in (str(r).strip().upper(), normalize_plate(r)):
+            slot_id = store.find_vehicle(candidate)
+            if slot_id:
+                return candidate, slot_id
+
+    # 🔎 Noisy OCR: snap onto a registered plate, then look that up
+    match = resolve_reads([str(r) for r in reads])
+    if match:
+        slot_id = store.find_vehicle(match["plate"])
+        if slot_id:
+            return match["plate"], slot_id
+    return None, None
+
+@timed("parkour_exit_seconds")
+def process_exit(read, role=None, when=None):
+    # One pass: resolve booking -> bill from the recorded check-in -> release -> queue the CSV write
+    started = time.perf_counter()
+    vehicle, slot_id = resolve_vehicle(read)
+    if slot_id is None:
+        inc("parkour_exits_total", result="unknown_vehicle")
+        return None
+
+    store = load_slot_store()
+    user_id = store.user_of(slot_id)
+    check_in = store.check_in_of(slot_id)
+    check_out = when or datetime.now()
+    role = role or _role_of(user_id)
+    bill = price_session(check_in, check_out, role) if check_in else None
+
+    if not update_slot(slot_id, AVAILABLE, "", "", defer_save=True, expected_status=OCCUPIED):
+        inc("parkour_exits_total", result="unknown_vehicle")
+        return None  # released by someone else between lookup and release
+    close_booking(vehicle)
+    inc("parkour_exits_total", result="billed" if bill is not None else "no_check_in")
+    return {
+        "vehicle": vehicle,
+        "slot_id": slot_id,
+        "level": store.level_of(slot_id),
+        "user_id": user_id,
+        "role": role,
+        "check_in": check_in,
+        "check_out": check_out,
+        "bill": bill,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
+
+# 🧪 Benchmark: park vehicles, then drive them all out through the fast path
+def benchmark_exit(n_vehicles=15, seed=1):
+    import io
+    import random
+    import contextlib
+    import numpy as np
+    import slot_utils
+    from simulator import sandbox
+
+    rng = random.Random(seed)
+    with sandbox(), contextlib.redirect_stdout(io.StringIO()):
+        slot_utils.clear_all_slots()
+        slot_ids = slot_utils.get_all_slot_ids()[:n_vehicles]
+        plates = [f"TN{rng.randint(10, 99)}EX{i:04d}" for i in range(len(slot_ids))]
+        for plate, slot_id in zip(plates, slot_ids):
+            slot_utils.update_slot(slot_id, "Occupied", plate, "user_1")
+
+        timings, billed = [], 0
+        for plate in plates:
+            start = time.perf_counter()
+            receipt = process_exit([plate.lower(), "XXXX"], when=datetime.now())
+            timings.append(time.perf_counter() - start)
+            if receipt and receipt["bill"] is not None:
+                billed += 1
+        flush_slot_writes()
+        left = slot_utils.load_slot_store().count(OCCUPIED)
+    return {
+        "exits": len(plates),
+        "billed": billed,
+        "still_occupied": left,
+        "p50_ms": round(float(np.percentile(timings, 50)) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2)
+    }
+
+if __name__ == "__main__":
+    print(benchmark_exit())
@@ -1,17 +1,27 @@
+import os
 from datetime import datetime, timedelta
 
 # 🧠 Core modules
 from user_auth import register_user, login_user
 from ocr import capture_and_scan_plate
-from slot_utils import assign_slot, release_slot, show_available_slots, get_available_slot_ids, clear_all_slots
-from qr_generator import generate_qr
-from vehicle_utils import calculate_bill
+from slot_utils import assign_slot, release_slot, show_available_slots, get_available_slot_ids, clear_all_slots, get_slot_level, flush_slot_writes
+from qr_generator import issue_qr
+from exit_lane import process_exit
+from vehicle_utils import calculate_bill, save_booking
+from reservations import shift_window, cancel
 from alerts import schedule_terminal_reminder
+from plate_registry import resolve_reads, SUGGEST_DISTANCE
+from metrics import is_enabled, export_prometheus, start_profile, dump_profile
 
 # 🔬 AI Optimization Module
 from ai_optimization import qaoa_optimize, real_world_allocate
 
 vehicle_types = ["Compact", "Sedan", "SUV", "Truck"]
+level_names = {
+    "L1": "Ground Floor",
+    "L2": "First Floor",
+    "L3": "Second Floor"
+}
 role_options = {
     "1": "guest",
     "2": "user",
@@ -27,20 +37,13 @@ def choose_role():
     choice = input("Enter choice (1–5): ").strip()
     return role_options.get(choice, "guest")
 
-def handle_role_based_booking(user_data, vehicle_number):
+def choose_booking_window(user_data):
+    # Asked before allocating, so the calendar is checked over the real stay.
+    # Returns (start, end, shift) — end None means the default look-ahead — or None to abort.
     role = user_data.get("Role", "user")
     now = datetime.now()
 
-    if role in ["user", "guest"]:
-        try:
-            duration = int(input("⏳ Enter parking duration (in minutes): "))
-            booking_end = now + timedelta(minutes=duration)
-            schedule_terminal_reminder(vehicle_number, booking_end, delay_minutes=30)
-            print(f"⏰ Reminder set for {booking_end.strftime('%H:%M:%S')}")
-        except ValueError:
-            print("⚠️ Invalid input for duration.")
-
-    elif role in ["official", "worker"]:
+    if role in ["official", "worker"]:
         print("📅 Choose a predefined slot:")
         time_slots = {
             "1": ("09:00", "12:00"),
@@ -65,22 +68,61 @@ def handle_role_based_booking(user_data, vehicle_number):
             start_str = input("Start time (HH:MM): ")
             end_str = input("End time (HH:MM): ")
 
-        today = now.strftime('%Y-%m-%d')
-        start = datetime.strptime(f"{today} {start_str}", "%Y-%m-%d %H:%M")
-        end = datetime.strptime(f"{today} {end_str}", "%Y-%m-%d %H:%M")
-        duration = int((end - start).total_seconds() // 60)
-        print(f"⏰ Slot booked from {start_str} to {end_str} ({duration} minutes)")
+        try:
+            start, end = shift_window(start_str, end_str, now)
+        except ValueError:
+            print("⚠️ Invalid time format.")
+            return None
+        return start, end, True
 
-    elif role == "intern":
+    if role == "intern":
         try:
             hours = int(input("⌛ How many hours? "))
-            booking_end = now + timedelta(hours=hours)
-            print(f"🕒 Slot booked for {hours} hour(s). Ends at {booking_end.strftime('%H:%M')}")
+            return now, now + timedelta(hours=hours), False
         except ValueError:
             print("⚠️ Invalid input.")
+            return now, None, False
+
+    try:
+        duration = int(input("⏳ Enter parking duration (in minutes): "))
+        return now, now + timedelta(minutes=duration), False
+    except ValueError:
+        print("⚠️ Invalid input for duration.")
+        return now, None, False
+
+def handle_role_based_booking(user_data, vehicle_number, slot_id, start, end):
+    # Runs after the slot is claimed; returns False when the booking had to be rolled back
+    role = user_data.get("Role", "user")
+    user_id = user_data.get("User_ID", "unknown")
+
+    if role in ["user", "guest"]:
+        if end is not None:
+            schedule_terminal_reminder(vehicle_number, end, delay_minutes=30)
+            print(f"⏰ Reminder set for {end.strftime('%H:%M:%S')}")
+
+    elif role in ["official", "worker"]:
+        duration = int((end - start).total_seconds() // 60)
+        try:
+            booked = save_booking(user_id, slot_id, start, end, round(duration / 60, 2), reserved=True)
+        except Exception as e:
+            print(f"⚠️ Could not save booking: {e}")
+            booked = False
+        if not booked:
+            release_slot(vehicle_number)
+            cancel(slot_id, owner=user_id, start=start)
+            return False
+        print(f"⏰ Slot booked from {start:%H:%M} to {end:%H:%M} ({duration} minutes)")
+
+    elif role == "intern":
+        if end is not None:
+            hours = round((end - start).total_seconds() / 3600)
+            print(f"🕒 Slot booked for {hours} hour(s). Ends at {end.strftime('%H:%M')}")
+    return True
 
 def main():
     print("🚗 Welcome to Parkour - Smart Parking System")
+    if os.environ.get("PARKOUR_PROFILE"):
+        start_profile()
 
     while True:
         print("\n1. Register\n2. Login\n3. Guest Entry\n4. Exit")
@@ -116,6 +158,11 @@ def main():
 
         elif choice == "4":
             print("👋 Thank you for using Parkour!")
+            flush_slot_writes()
+            if is_enabled():
+                print(f"📊 Metrics written to {export_prometheus()}")
+            if os.environ.get("PARKOUR_PROFILE"):
+                dump_profile()
             break
 
         else:
@@ -124,7 +171,17 @@ def main():
 
         print(f"\n👋 Welcome, {user_data['Name']}!")
 
-        if not vehicle_number:
+        # 🔎 Snap noisy OCR reads onto a registered plate when one is close enough
+        match = resolve_reads(vehicle_number) if vehicle_number else None
+        if vehicle_number and not match:
+            # Further off than look-alike swaps: could be a different car, so ask first
+            suggestion = resolve_reads(vehicle_number, max_distance=SUGGEST_DISTANCE)
+            if suggestion and input(f"❓ Did you mean {suggestion['plate']}? (y/n): ").strip().lower() == "y":
+                match = suggestion
+        if match:
+            print(f"🔎 Recognised registered plate {match['plate']} (read: {match['read']})")
+            vehicle_number = match["plate"]
+        elif not vehicle_number:
             vehicle_number = input("Enter vehicle number: ").upper()
         elif isinstance(vehicle_number, list):
             print("📋 Multiple plates detected:")
@@ -142,9 +199,13 @@ def main():
 
             if action == "1":
                 role = user_data.get("Role", "user")
+                window = choose_booking_window(user_data)
+                if window is None:
+                    continue
+                start, end, shift = window
                 print("⚙️ Optimizing slot using AI algorithms...")
 
-                available_slot_ids = get_available_slot_ids()
+                available_slot_ids = get_available_slot_ids(start, end, owner=user_data.get("User_ID"))
 
                 if not available_slot_ids:
                     print("❌ No slots available!")
@@ -158,32 +219,40 @@ def main():
 
                 print(f"✅ AI Assigned Slot: {selected_slot}")
 
-                assigned = assign_slot(selected_slot, vehicle_number, user_data.get("User_ID", "unknown"))
-                if assigned:
-                    generate_qr(vehicle_number)
-                    if "L1" in selected_slot:
-                        print("🅿️ Ground Floor (L1)")
-                    elif "L2" in selected_slot:
-                        print("🅿️ First Floor (L2)")
-                    elif "L3" in selected_slot:
-                        print("🅿️ Second Floor (L3)")
-                    handle_role_based_booking(user_data, vehicle_number)
+                assigned = assign_slot(vehicle_number, user_data.get("User_ID", "unknown"), role,
+                                       preferred_slot=selected_slot, start=start, end=end,
+                                       reserve_window=shift)
+                if assigned and handle_role_based_booking(user_data, vehicle_number, assigned, start, end):
+                    selected_slot = assigned
+                    issue_qr(vehicle_number, selected_slot, user_data.get("User_ID", "unknown"))
+                    level = get_slot_level(selected_slot)
+                    if level in level_names:
+                        print(f"🅿️ {level_names[level]} ({level})")
                 else:
                     print("❌ Failed to assign slot.")
 
             elif action == "2":
                 print(f"📤 Releasing slot for vehicle {vehicle_number}")
-                start_time = input("Enter start time (HH:MM): ")
-                end_time = input("Enter end time (HH:MM): ")
-                try:
-                    today = datetime.today().strftime('%Y-%m-%d')
-                    start = datetime.strptime(f"{today} {start_time}", "%Y-%m-%d %H:%M")
-                    end = datetime.strptime(f"{today} {end_time}", "%Y-%m-%d %H:%M")
-                    bill = calculate_bill(start, end, role=user_data.get("Role", "user"))
-                    print(f"💸 Total bill: ₹{bill}")
-                    release_slot(vehicle_number)
-                except Exception as e:
-                    print(f"⚠️ Error: {e}")
+                # ⚡ Fast path: bill from the check-in recorded at assignment
+                receipt = process_exit(vehicle_number, role=user_data.get("Role", "user"))
+                if receipt is None:
+                    print("⚠️ Vehicle not found in any occupied slot.")
+                elif receipt["bill"] is not None:
+                    print(f"🔓 Slot {receipt['slot_id']} is now available.")
+                    print(f"💸 Total bill: ₹{receipt['bill']} (in at {receipt['check_in']:%H:%M})")
+                else:
+                    # Parked before check-in times were recorded: fall back to manual times
+                    print(f"🔓 Slot {receipt['slot_id']} is now available.")
+                    start_time = input("Enter start time (HH:MM): ")
+                    end_time = input("Enter end time (HH:MM): ")
+                    try:
+                        today = datetime.today().strftime('%Y-%m-%d')
+                        start = datetime.strptime(f"{today} {start_time}", "%Y-%m-%d %H:%M")
+                        end = datetime.strptime(f"{today} {end_time}", "%Y-%m-%d %H:%M")
+                        bill = calculate_bill(start, end, role=user_data.get("Role", "user"))
+                        print(f"💸 Total bill: ₹{bill}")
+                    except Exception as e:
+                        print(f"⚠️ Error: {e}")
 
             elif action == "3":
                 show_available_slots()
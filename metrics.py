@@ -0,0 +1,166 @@
+import os
+import time
+import threading
+import functools
+import cProfile
+import pandas as pd
+
+# 📊 Off unless PARKOUR_METRICS is set; when off every hook is a single flag check
+_state = {"enabled": os.environ.get("PARKOUR_METRICS", "") not in ("", "0"), "profiler": None}
+
+METRICS_FILE = "parkour_metrics.prom"
+PROFILE_FILE = "parkour.prof"
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_counters = {}
+_histograms = {}
+_lock = threading.Lock()
+
+def enable():
+    _state["enabled"] = True
+
+def disable():
+    _state["enabled"] = False
+
+def is_enabled():
+    return _state["enabled"]
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+# ==================== RECORDING ====================
+def inc(name, value=1, **labels):
+    if not _state["enabled"]:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name, value, **labels):
+    if not _state["enabled"]:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = {"buckets": [0] * len(DEFAULT_BUCKETS), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(DEFAULT_BUCKETS):
+            if value <= bound:
+                hist["buckets"][i] += 1
+        hist["sum"] += value
+        hist["count"] += 1
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+        if exc_type is not None:
+            inc(f"{self.name.removesuffix('_seconds')}_errors_total", **self.labels)
+        return False
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+def timer(name, **labels):
+    if not _state["enabled"]:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+def timed(name, **labels):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return func(*args, **kwargs)
+            with _Timer(name, labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# ==================== CSV I/O ====================
+def read_csv(path, **kwargs):
+    with timer("parkour_csv_read_seconds", file=os.path.basename(path)):
+        return pd.read_csv(path, **kwargs)
+
+def write_csv(df, path, **kwargs):
+    kwargs.setdefault("index", False)
+    with timer("parkour_csv_write_seconds", file=os.path.basename(path)):
+        df.to_csv(path, **kwargs)
+
+# ==================== EXPORT ====================
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{str(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+def render_prometheus():
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, dict(v, buckets=list(v["buckets"]))) for k, v in _histograms.items())
+
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    for (name, labels), hist in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        for bound, count in zip(DEFAULT_BUCKETS, hist["buckets"]):
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+        lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist['count']}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']:.6f}")
+        lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+    return "\n".join(lines) + "\n"
+
+def export_prometheus(path=METRICS_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+    return path
+
+# ==================== PROFILING ====================
+def start_profile():
+    if _state["profiler"] is None:
+        _state["profiler"] = cProfile.Profile()
+        _state["profiler"].enable()
+
+def dump_profile(path=PROFILE_FILE):
+    profiler = _state["profiler"]
+    if profiler is None:
+        print("⚠️ Profiler is not running.")
+        return None
+    profiler.disable()
+    profiler.dump_stats(path)
+    _state["profiler"] = None
+    print(f"🧾 Profile written to {path}")
+    return path
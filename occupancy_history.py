@@ -0,0 +1,257 @@
+import os
+import json
+import threading
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+HISTORY_DIR = "occupancy_history"
+CATALOG_FILE = "slots.json"
+
+OCCUPY = 1
+RELEASE = 0
+OPEN_END = np.iinfo(np.int64).max
+
+# 🗂️ One append-only binary file per column inside each day partition
+COLUMNS = {
+    "ts": np.int64,      # seconds since epoch (wall clock)
+    "slot": np.int32,    # index into the slot catalog
+    "event": np.int8     # OCCUPY / RELEASE
+}
+
+_lock = threading.Lock()
+_catalogs = {}
+
+# ==================== SLOT CATALOG ====================
+def _load_catalog(history_dir):
+    # Keyed by absolute path: a relative dir means a different catalog after a chdir
+    key = os.path.abspath(history_dir)
+    catalog = _catalogs.get(key)
+    if catalog is not None:
+        return catalog
+
+    path = os.path.join(history_dir, CATALOG_FILE)
+    rows = []
+    if os.path.exists(path):
+        with open(path) as f:
+            rows = json.load(f)["slots"]
+    catalog = {
+        "rows": rows,
+        "index": {slot_id: i for i, (slot_id, _, _) in enumerate(rows)}
+    }
+    _catalogs[key] = catalog
+    return catalog
+
+def _slot_code(history_dir, slot_id, level, slot_type):
+    catalog = _load_catalog(history_dir)
+    code = catalog["index"].get(slot_id)
+    if code is not None:
+        return code
+
+    code = len(catalog["rows"])
+    catalog["rows"].append([slot_id, str(level), str(slot_type)])
+    catalog["index"][slot_id] = code
+    os.makedirs(history_dir, exist_ok=True)
+    with open(os.path.join(history_dir, CATALOG_FILE), "w") as f:
+        json.dump({"slots": catalog["rows"]}, f)
+    return code
+
+def _catalog_arrays(history_dir):
+    rows = _load_catalog(history_dir)["rows"]
+    if not rows:
+        empty = np.array([], dtype=str)
+        return empty, empty, empty
+    slot_ids, levels, types = (np.array(col, dtype=str) for col in zip(*rows))
+    return slot_ids, levels, types
+
+# ==================== WRITE PATH ====================
+def _to_seconds(when):
+    if when is None:
+        when = datetime.now()
+    return int(np.datetime64(when, "s").astype(np.int64))
+
+def _partition_dir(history_dir, ts):
+    day = np.datetime64(ts, "s").astype("datetime64[D]")
+    return os.path.join(history_dir, str(day))
+
+def record_event(slot_id, level, slot_type, event, when=None, history_dir=HISTORY_DIR):
+    ts = _to_seconds(when)
+    with _lock:
+        code = _slot_code(history_dir, slot_id, level, slot_type)
+        partition = _partition_dir(history_dir, ts)
+        os.makedirs(partition, exist_ok=True)
+        for name, value in (("ts", ts), ("slot", code), ("event", event)):
+            with open(os.path.join(partition, f"{name}.bin"), "ab") as f:
+                np.array([value], dtype=COLUMNS[name]).tofile(f)
+
+def record_occupy(slot_id, level, slot_type, when=None, history_dir=HISTORY_DIR):
+    record_event(slot_id, level, slot_type, OCCUPY, when, history_dir)
+
+def record_release(slot_id, level, slot_type, when=None, history_dir=HISTORY_DIR):
+    record_event(slot_id, level, slot_type, RELEASE, when, history_dir)
+
+def append_events(slot_ids, levels, slot_types, events, timestamps, history_dir=HISTORY_DIR):
+    # Bulk import (e.g. backfills); rows are grouped into their day partitions
+    ts = np.asarray(timestamps, dtype="datetime64[s]").astype(np.int64)
+    events = np.asarray(events, dtype=np.int8)
+    with _lock:
+        unique_ids, first, inverse = np.unique(np.asarray(slot_ids, dtype=str), return_index=True, return_inverse=True)
+        levels, slot_types = np.asarray(levels, dtype=str), np.asarray(slot_types, dtype=str)
+        unique_codes = np.array([
+            _slot_code(history_dir, s, levels[i], slot_types[i]) for s, i in zip(unique_ids, first)
+        ], dtype=np.int32)
+        codes = unique_codes[inverse.ravel()]
+        days = (ts // 86400).astype(np.int64)
+        for day in np.unique(days):
+            mask = days == day
+            partition = _partition_dir(history_dir, int(day) * 86400)
+            os.makedirs(partition, exist_ok=True)
+            for name, column in (("ts", ts), ("slot", codes), ("event", events)):
+                with open(os.path.join(partition, f"{name}.bin"), "ab") as f:
+                    column[mask].astype(COLUMNS[name]).tofile(f)
+
+# ==================== READ PATH ====================
+def _load_range(history_dir, start_ts, end_ts, lookback_days):
+    first_day = np.datetime64(start_ts, "s").astype("datetime64[D]") - np.timedelta64(lookback_days, "D")
+    last_day = np.datetime64(end_ts, "s").astype("datetime64[D]")
+
+    chunks = {name: [] for name in COLUMNS}
+    if os.path.isdir(history_dir):
+        for entry in sorted(os.listdir(history_dir)):
+            try:
+                day = np.datetime64(entry, "D")
+            except ValueError:
+                continue
+            if day < first_day or day > last_day:
+                continue
+            partition = os.path.join(history_dir, entry)
+            sizes = {name: os.path.getsize(os.path.join(partition, f"{name}.bin")) // np.dtype(dtype).itemsize
+                     for name, dtype in COLUMNS.items()}
+            rows = min(sizes.values())  # ignore a torn trailing append
+            for name, dtype in COLUMNS.items():
+                chunks[name].append(np.fromfile(os.path.join(partition, f"{name}.bin"), dtype=dtype, count=rows))
+
+    return {
+        name: np.concatenate(parts) if parts else np.array([], dtype=COLUMNS[name])
+        for name, parts in chunks.items()
+    }
+
+def _intervals(events):
+    # Pair each occupy with the next release of the same slot; unmatched occupies stay open
+    order = np.lexsort((events["ts"], events["slot"]))
+    ts = events["ts"][order]
+    slot = events["slot"][order]
+    kind = events["event"][order]
+
+    same_slot = slot[:-1] == slot[1:]
+    closed = (kind[:-1] == OCCUPY) & (kind[1:] == RELEASE) & same_slot
+    is_last = np.append(~same_slot, True) if len(slot) else np.array([], dtype=bool)
+    still_open = (kind == OCCUPY) & is_last
+
+    starts = np.concatenate((ts[:-1][closed], ts[still_open]))
+    ends = np.concatenate((ts[1:][closed], np.full(still_open.sum(), OPEN_END, dtype=np.int64)))
+    slots = np.concatenate((slot[:-1][closed], slot[still_open]))
+    return starts, ends, slots
+
+def _group_filter(history_dir, slots, level=None, slot_type=None):
+    _, levels, types = _catalog_arrays(history_dir)
+    mask = np.ones(len(slots), dtype=bool)
+    if level is not None:
+        mask &= levels[slots] == level
+    if slot_type is not None:
+        mask &= types[slots] == slot_type
+    return mask
+
+def _group_keys(history_dir, by):
+    _, levels, types = _catalog_arrays(history_dir)
+    if by == "Level":
+        return levels
+    if by == "Type":
+        return types
+    raise ValueError(f"Unsupported grouping: {by}")
+
+def occupancy_over_time(start, end, step_minutes=60, level=None, slot_type=None,
+                        lookback_days=2, history_dir=HISTORY_DIR):
+    start_ts, end_ts = _to_seconds(start), _to_seconds(end)
+    events = _load_range(history_dir, start_ts, end_ts, lookback_days)
+    starts, ends, slots = _intervals(events)
+    mask = _group_filter(history_dir, slots, level, slot_type)
+
+    grid = np.arange(start_ts, end_ts, step_minutes * 60, dtype=np.int64)
+    occupied = (np.searchsorted(np.sort(starts[mask]), grid, side="right")
+                - np.searchsorted(np.sort(ends[mask]), grid, side="right"))
+    return pd.DataFrame({"Time": grid.astype("datetime64[s]"), "Occupied": occupied})
+
+def turnover(start, end, by="Level", history_dir=HISTORY_DIR):
+    start_ts, end_ts = _to_seconds(start), _to_seconds(end)
+    events = _load_range(history_dir, start_ts, end_ts, 0)
+    in_window = (events["ts"] >= start_ts) & (events["ts"] < end_ts) & (events["event"] == OCCUPY)
+
+    keys = _group_keys(history_dir, by)
+    groups, slot_group = np.unique(keys, return_inverse=True)
+    sessions = np.bincount(slot_group[events["slot"][in_window]], minlength=len(groups))
+    slot_counts = np.bincount(slot_group, minlength=len(groups))
+    return pd.DataFrame({
+        by: groups,
+        "Sessions": sessions,
+        "Slots": slot_counts,
+        "Turnover": np.round(sessions / np.maximum(slot_counts, 1), 2)
+    })
+
+def dwell_percentiles(start, end, percentiles=(50, 90, 95), by="Level",
+                      lookback_days=2, history_dir=HISTORY_DIR):
+    start_ts, end_ts = _to_seconds(start), _to_seconds(end)
+    events = _load_range(history_dir, start_ts, end_ts, lookback_days)
+    starts, ends, slots = _intervals(events)
+
+    done = (ends != OPEN_END) & (ends >= start_ts) & (ends < end_ts)
+    dwell_minutes = (ends[done] - starts[done]) / 60.0
+    keys = _group_keys(history_dir, by)[slots[done]] if done.any() else np.array([], dtype=str)
+
+    rows = []
+    for group in np.unique(keys):
+        values = dwell_minutes[keys == group]
+        row = {by: group, "Sessions": len(values)}
+        for p, value in zip(percentiles, np.percentile(values, percentiles)):
+            row[f"P{p}_Minutes"] = round(float(value), 1)
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+# 🧪 Benchmark: one month of synthetic events
+def benchmark_history(history_dir="occupancy_history_bench", n_slots=2000, sessions_per_slot=300, seed=7):
+    rng = np.random.default_rng(seed)
+    base = int(np.datetime64("2025-04-01T00:00:00", "s").astype(np.int64))
+    month = 30 * 86400
+
+    slot_ids = np.repeat([f"SLOT{i + 1}" for i in range(n_slots)], sessions_per_slot)
+    levels = np.repeat([f"L{(i % 3) + 1}" for i in range(n_slots)], sessions_per_slot)
+    types = np.repeat(["Electric" if i % 5 == 4 else "Normal" for i in range(n_slots)], sessions_per_slot)
+    # Chain each slot's sessions (gap, stay, gap, stay, ...) so stays on one slot never overlap
+    stays = rng.integers(10 * 60, 2 * 3600, (n_slots, sessions_per_slot))
+    gaps = rng.integers(60, 2 * 3600, (n_slots, sessions_per_slot))
+    arrivals = base + (np.cumsum(gaps + stays, axis=1) - stays).ravel()
+    departures = arrivals + stays.ravel()
+
+    start = time.time()
+    append_events(np.concatenate((slot_ids, slot_ids)), np.concatenate((levels, levels)),
+                  np.concatenate((types, types)),
+                  np.concatenate((np.full(arrivals.size, OCCUPY), np.full(departures.size, RELEASE))),
+                  np.concatenate((arrivals, departures)).astype("datetime64[s]"), history_dir)
+    write_time = time.time() - start
+
+    window = (np.datetime64(base, "s"), np.datetime64(base + month, "s"))
+    start = time.time()
+    occupancy_over_time(*window, level="L1", history_dir=history_dir)
+    turnover(*window, history_dir=history_dir)
+    dwell_percentiles(*window, by="Type", history_dir=history_dir)
+    query_time = time.time() - start
+
+    return {
+        "events": int(arrivals.size * 2),
+        "write_time": round(write_time, 4),
+        "query_time": round(query_time, 4)
+    }
+
+if __name__ == "__main__":
+    print(benchmark_history())
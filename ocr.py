@@ -1,12 +1,15 @@
 import os
 import cv2
 import time
+import threading
 import pytesseract
 import easyocr
 import xml.etree.ElementTree as ET
 import pandas as pd
 import numpy as np
 import roboflow
+from metrics import timer, timed, inc
+from lane_trigger import MotionTrigger
 
 # ======================= SETTINGS =======================
 images_dir = "datasets/images"                # Folder with original images
@@ -93,6 +96,7 @@ def crop_license_plates():
     print("🎯 All license plate crops completed and labels saved to plate_labels.csv.")
 
 # ============= STEP 2: TESSERACT FALLBACK ================
+@timed("parkour_ocr_stage_seconds", stage="tesseract")
 def fallback_tesseract_ocr(image):
     print("📸 Running Tesseract OCR as fallback...")
 
@@ -120,7 +124,8 @@ def capture_plate(cam_id=1, retries=3):
     cap = None
     attempt = 0
     while attempt < retries:
-        cap = cv2.VideoCapture(cam_id)
+        with timer("parkour_ocr_stage_seconds", stage="camera_open"):
+            cap = cv2.VideoCapture(cam_id)
         if cap.isOpened():
             print(f"✅ Camera {cam_id} opened (attempt {attempt + 1})")
             break
@@ -135,15 +140,23 @@ def capture_plate(cam_id=1, retries=3):
 
     print("⏳ Capturing frame in 5 seconds. Please position the plate in view.")
     time.sleep(5)
-    ret, frame = cap.read()
+    with timer("parkour_ocr_stage_seconds", stage="frame_capture"):
+        ret, frame = cap.read()
     cap.release()
 
     if not ret:
         print("❌ Failed to capture frame.")
         return []
 
+    return read_plate_frame(frame)
+
+# ============ STEP 3b: OCR ON AN ALREADY-GRABBED FRAME ============
+_ocr_lock = threading.Lock()  # one EasyOCR reader shared by every lane
+
+def read_plate_frame(frame):
     print("🔍 Running EasyOCR...")
-    results = ocr.readtext(frame)
+    with _ocr_lock, timer("parkour_ocr_stage_seconds", stage="easyocr"):
+        results = ocr.readtext(frame)
 
     detected_texts = []
     for (bbox, text, confidence) in results:
@@ -153,10 +166,49 @@ def capture_plate(cam_id=1, retries=3):
             detected_texts.append(cleaned)
 
     if detected_texts:
+        inc("parkour_plate_reads_total", engine="easyocr")
         return list(set(detected_texts))
     else:
         print("⚠️ EasyOCR failed. Falling back to Tesseract OCR...")
-        return fallback_tesseract_ocr(frame)
+        inc("parkour_plate_reads_total", engine="tesseract")
+        with _ocr_lock:
+            return fallback_tesseract_ocr(frame)
+
+# ============ STEP 3c: UNATTENDED LANES (MOTION-TRIGGERED) ============
+def watch_lane(cam_id, on_plate, fps=10, trigger=None, stop_event=None):
+    # Poll at a low frame rate; OCR fires only once a vehicle stands still and in focus
+    cap = cv2.VideoCapture(cam_id)
+    if not cap.isOpened():
+        print(f"❌ Lane camera {cam_id} could not be opened.")
+        return
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # always look at the latest frame
+    trigger = trigger or MotionTrigger(lane=str(cam_id))
+    stop_event = stop_event or threading.Event()
+    interval = 1.0 / fps
+    print(f"🚦 Watching lane {cam_id} at {fps} fps")
+    try:
+        while not stop_event.is_set():
+            started = time.perf_counter()
+            ret, frame = cap.read()
+            if not ret:
+                print(f"⚠️ Lane {cam_id}: frame grab failed, retrying...")
+                stop_event.wait(1)
+                continue
+            if trigger.update(frame):
+                plates = read_plate_frame(frame)
+                if plates:
+                    on_plate(cam_id, plates)
+            stop_event.wait(max(0.0, interval - (time.perf_counter() - started)))
+    finally:
+        cap.release()
+
+def watch_lanes(cam_ids, on_plate, fps=10):
+    # One light thread per lane; returns the event that stops them all
+    stop_event = threading.Event()
+    for cam_id in cam_ids:
+        threading.Thread(target=watch_lane, args=(cam_id, on_plate, fps, None, stop_event),
+                         name=f"lane-{cam_id}", daemon=True).start()
+    return stop_event
 
 # =================== MAIN FUNCTION ======================
 def capture_and_scan_plate():
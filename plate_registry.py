@@ -0,0 +1,236 @@
+import os
+import threading
+import pandas as pd
+from snapshot import load_frame
+from metrics import read_csv, timed
+
+VEHICLE_CSV = "vehicle_information_dataset_extended.csv"
+USER_CSV = "user_authentication_dataset.csv"
+PROFILE_CSV = "user_authentication_dataset_extended.csv"
+
+# Vehicle types used in the datasets -> CAR_DIMENSIONS class
+VEHICLE_CLASS = {
+    "bike": "Compact",
+    "compact": "Compact",
+    "car": "Sedan",
+    "sedan": "Sedan",
+    "suv": "SUV",
+    "truck": "Truck"
+}
+
+# 🔤 Characters OCR mixes up (see outputs.txt: 0ZI7YXR / DZIZYXR); first char is the canonical one
+CONFUSION_GROUPS = ["0ODQ", "1IL", "2Z7", "5S", "8B", "6G"]
+CONFUSION_COST = 0.25
+# Auto-accept only look-alike swaps (each costs 0.25); any real edit costs 1.0 and could be
+# another registered car, so that wider radius is for suggestions a person confirms
+MAX_DISTANCE = 0.75
+SUGGEST_DISTANCE = 1.5
+
+_CANONICAL = str.maketrans({c: group[0] for group in CONFUSION_GROUPS for c in group})
+_GROUP_OF = {c: group[0] for group in CONFUSION_GROUPS for c in group}
+
+def normalize_plate(text):
+    return "".join(c for c in str(text).upper() if c.isalnum())
+
+def canonical_plate(text):
+    return normalize_plate(text).translate(_CANONICAL)
+
+def ocr_distance(a, b):
+    # Edit distance where swapping look-alike characters is cheap
+    previous = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        current = [float(i)]
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                sub = 0.0
+            elif _GROUP_OF.get(ca, ca) == _GROUP_OF.get(cb, cb):
+                sub = CONFUSION_COST
+            else:
+                sub = 1.0
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + sub))
+        previous = current
+    return previous[-1]
+
+# 🔎 Deletion-neighbourhood index over canonical plates: two keys within one
+# edit share a single-character deletion, so a lookup is len(key) dict probes
+class DeletionIndex:
+    __slots__ = ("keys", "deletes")
+
+    def __init__(self):
+        self.keys = set()
+        self.deletes = {}   # key with one char removed -> key or [keys]
+
+    def add(self, key):
+        if key in self.keys:
+            return
+        self.keys.add(key)
+        for i in range(len(key)):
+            variant = key[:i] + key[i + 1:]
+            known = self.deletes.get(variant)
+            if known is None:
+                self.deletes[variant] = key
+            elif isinstance(known, list):
+                known.append(key)
+            else:
+                self.deletes[variant] = [known, key]
+
+    def search(self, key):
+        # Superset of the keys within one edit; callers re-score with ocr_distance
+        found = set()
+        variants = {key[:i] + key[i + 1:] for i in range(len(key))}
+        if key in self.keys:
+            found.add(key)
+        for variant in variants:
+            if variant in self.keys:
+                found.add(variant)            # read has an extra character
+        for probe in variants | {key}:
+            known = self.deletes.get(probe)
+            if known is None:
+                continue
+            found.update(known if isinstance(known, list) else (known,))
+        return list(found)
+
+def _is_true(value):
+    return str(value).strip().lower() in {"true", "yes", "1", "1.0"}
+
+class PlateRegistry:
+    def __init__(self):
+        self.entries = {}        # normalized plate -> info
+        self.by_canonical = {}   # canonical plate -> [normalized plates]
+        self.near = DeletionIndex()
+        self._lock = threading.Lock()
+
+    def register(self, plate, vehicle_type=None, is_ev=False, user_id=None):
+        key = normalize_plate(plate)
+        if not key:
+            return
+        info = {
+            "plate": key,
+            "vehicle_type": vehicle_type,
+            "car_type": VEHICLE_CLASS.get(str(vehicle_type).lower()),
+            "is_ev": bool(is_ev),
+            "user_id": user_id
+        }
+        with self._lock:
+            known = self.entries.get(key)
+            if known:
+                # Keep the richest record (user CSV rows add the owner)
+                info = {k: v if v is not None else known.get(k) for k, v in info.items()}
+            self.entries[key] = info
+            canon = key.translate(_CANONICAL)
+            bucket = self.by_canonical.setdefault(canon, [])
+            if key not in bucket:
+                bucket.append(key)
+            self.near.add(canon)
+
+    def load_frame(self, df, plate_col, type_col, ev_col, user_col=None):
+        if plate_col not in df.columns:
+            return
+        df = df.dropna(subset=[plate_col])
+        users = df[user_col] if user_col in df.columns else [None] * len(df)
+        types = df[type_col] if type_col in df.columns else [None] * len(df)
+        evs = df[ev_col] if ev_col in df.columns else [False] * len(df)
+        for plate, vehicle_type, is_ev, user_id in zip(df[plate_col], types, evs, users):
+            self.register(plate, None if pd.isna(vehicle_type) else vehicle_type, _is_true(is_ev),
+                          None if user_id is None or pd.isna(user_id) else user_id)
+
+    @timed("parkour_plate_lookup_seconds")
+    def lookup(self, read, max_distance=MAX_DISTANCE):
+        key = normalize_plate(read)
+        if not key:
+            return None
+        exact = self.entries.get(key)
+        if exact:
+            return dict(exact, distance=0.0, read=key)
+
+        # Pure look-alike confusions land in the same canonical bucket (O(1))
+        canon = key.translate(_CANONICAL)
+        candidates = list(self.by_canonical.get(canon, []))
+        if not candidates:
+            for near in self.near.search(canon):
+                candidates.extend(self.by_canonical.get(near, []))
+
+        scored = sorted((ocr_distance(key, c), c) for c in candidates)
+        scored = [(d, c) for d, c in scored if d <= max_distance]
+        if not scored or (len(scored) > 1 and scored[0][0] == scored[1][0]):
+            return None  # nothing close, or ambiguous: don't guess
+        distance, plate = scored[0]
+        return dict(self.entries[plate], distance=round(distance, 2), read=key)
+
+    def best_of(self, reads, max_distance=MAX_DISTANCE):
+        matches = [m for m in (self.lookup(r, max_distance) for r in reads) if m]
+        return min(matches, key=lambda m: m["distance"]) if matches else None
+
+    def __len__(self):
+        return len(self.entries)
+
+# ==================== MODULE REGISTRY ====================
+_registry = {"instance": None}
+
+def build_registry():
+    registry = PlateRegistry()
+    if os.path.exists(VEHICLE_CSV):
+        registry.load_frame(load_frame(VEHICLE_CSV), "vehicle_number", "vehicle_type", "is_ev")
+    if os.path.exists(PROFILE_CSV):
+        registry.load_frame(load_frame(PROFILE_CSV), "vehicle_number", "vehicle_type", "is_ev", "User_ID")
+    if os.path.exists(USER_CSV):
+        registry.load_frame(read_csv(USER_CSV), "VehicleNumber", "VehicleType", "IsElectric", "User_ID")
+    return registry
+
+def get_registry():
+    if _registry["instance"] is None:
+        _registry["instance"] = build_registry()
+    return _registry["instance"]
+
+def reload_registry():
+    _registry["instance"] = None
+    return get_registry()
+
+def lookup_plate(read, max_distance=MAX_DISTANCE):
+    return get_registry().lookup(read, max_distance)
+
+def resolve_reads(reads, max_distance=MAX_DISTANCE):
+    # Pick the OCR candidate that snaps closest to a registered plate
+    if isinstance(reads, str):
+        reads = [reads]
+    return get_registry().best_of(reads or [], max_distance)
+
+# 🧪 Benchmark: noisy reads against a large synthetic fleet
+def benchmark_registry(n_plates=100_000, n_reads=2000, seed=5):
+    import random
+    import time
+    rng = random.Random(seed)
+    letters, digits = "ABCDEFGHJKMNPRTUVWXY", "0123456789"
+    registry = PlateRegistry()
+    plates = set()
+    while len(plates) < n_plates:
+        plates.add("TN" + rng.choice(digits) + rng.choice(digits) + rng.choice(letters) + rng.choice(letters)
+                   + "".join(rng.choice(digits) for _ in range(4)))
+    plates = sorted(plates)
+
+    start = time.time()
+    for plate in plates:
+        registry.register(plate, "Car", False)
+    build_time = time.time() - start
+
+    swaps = {"0": "D", "1": "I", "8": "B", "5": "S", "2": "Z"}
+    reads = []
+    for plate in rng.sample(plates, n_reads):
+        chars = list(plate)
+        i = rng.randrange(len(chars))
+        chars[i] = swaps.get(chars[i], rng.choice(letters + digits))
+        reads.append((plate, "".join(chars)))
+
+    start = time.time()
+    found = [(plate, (registry.lookup(read) or {}).get("plate")) for plate, read in reads]
+    lookup_time = time.time() - start
+    return {
+        "plates": n_plates,
+        "build_s": round(build_time, 2),
+        "avg_lookup_ms": round(lookup_time / n_reads * 1000, 3),
+        "correct": round(sum(got == plate for plate, got in found) / n_reads, 3),
+        "wrong_vehicle": sum(got is not None and got != plate for plate, got in found)
+    }
+
+if __name__ == "__main__":
+    print(benchmark_registry())
@@ -2,12 +2,93 @@
 
 import qrcode
 import os
+import io
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cv2
+
+QR_FOLDER = os.path.join("static", "qr_codes")
+PNG_CACHE_SIZE = 256
+
+# 🧵 Single background worker so rendering/disk I/O never blocks the booking flow
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qr")
+_png_cache = OrderedDict()
+_active_bookings = {}
+_detector = cv2.QRCodeDetector()
+_lock = threading.Lock()
+
+def qr_path(payload):
+    # Content-addressed: the same plate always maps to the same file
+    digest = hashlib.sha256(payload.encode()).hexdigest()[:16]
+    return os.path.join(QR_FOLDER, f"{digest}.png")
+
+def _remember_png(payload, data):
+    with _lock:
+        _png_cache[payload] = data
+        _png_cache.move_to_end(payload)
+        while len(_png_cache) > PNG_CACHE_SIZE:
+            _png_cache.popitem(last=False)
+
+def _render(payload, keep_bytes=False):
+    path = qr_path(payload)
+    if not os.path.exists(path):
+        os.makedirs(QR_FOLDER, exist_ok=True)
+        buffer = io.BytesIO()
+        qrcode.make(payload).save(buffer, format="PNG")
+        # Unique temp file per render: concurrent renders of one payload must not share it
+        with tempfile.NamedTemporaryFile(dir=QR_FOLDER, suffix=".tmp", delete=False) as f:
+            f.write(buffer.getvalue())
+        os.replace(f.name, path)
+        if keep_bytes:
+            _remember_png(payload, buffer.getvalue())
+    elif keep_bytes and payload not in _png_cache:
+        with open(path, "rb") as f:
+            _remember_png(payload, f.read())
+    return path
 
 def generate_qr(vehicle_number):
-    # Create the directory if it doesn't exist
-    qr_folder = "static\qr_codes"
-    os.makedirs(qr_folder, exist_ok=True)
+    return _render(vehicle_number)
+
+def issue_qr(vehicle_number, slot_id=None, user_id=None, keep_bytes=False):
+    # Index the booking now (cheap); render on the worker and return a Future of the path
+    with _lock:
+        _active_bookings[vehicle_number] = {
+            "Vehicle": vehicle_number,
+            "Slot_ID": slot_id,
+            "User_ID": user_id,
+            "Issued_At": datetime.now()
+        }
+    return _executor.submit(_render, vehicle_number, keep_bytes)
+
+def get_qr_png(vehicle_number):
+    with _lock:
+        data = _png_cache.get(vehicle_number)
+        if data is not None:
+            _png_cache.move_to_end(vehicle_number)
+            return data
+    # Cache miss: render on the QR worker, not on the caller's thread
+    path = _executor.submit(_render, vehicle_number, True).result()
+    with open(path, "rb") as f:
+        return f.read()
+
+# ================= EXIT: DECODE + RESOLVE =================
+def resolve_qr(payload):
+    return _active_bookings.get(payload.strip())
+
+def scan_qr(frame):
+    ok, payloads, _, _ = _detector.detectAndDecodeMulti(frame)
+    if not ok:
+        return None
+    for payload in payloads:
+        booking = resolve_qr(payload) if payload else None
+        if booking:
+            return booking
+    return None
 
-    # Generate and save the QR code
-    img = qrcode.make(vehicle_number)
-    img.save(f"{qr_folder}/{vehicle_number}.png")
+def close_booking(vehicle_number):
+    with _lock:
+        return _active_bookings.pop(vehicle_number, None)
@@ -0,0 +1,129 @@
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+import pandas as pd
+
+USER_CSV = "user_authentication_dataset.csv"
+
+# Look-ahead used when allocating "now": a slot reserved within this window is not offered
+RESERVATION_HORIZON = timedelta(minutes=60)
+
+# 📅 Per-slot calendar: slot_id -> {"starts": [...], "ends": [...], "owners": [...]}
+# Intervals are half-open [start, end), sorted and non-overlapping, so both
+# lists stay sorted and every lookup is a single bisect.
+_calendar = {}
+_lock = threading.Lock()
+_loaded = False
+
+def shift_window(start_str, end_str, day=None):
+    # "21:01" -> "00:00" ends on the next day rather than before it starts
+    day = day or datetime.now()
+    today = day.strftime('%Y-%m-%d')
+    start = datetime.strptime(f"{today} {start_str}", "%Y-%m-%d %H:%M")
+    end = datetime.strptime(f"{today} {end_str}", "%Y-%m-%d %H:%M")
+    if end <= start:
+        end += timedelta(days=1)
+    return start, end
+
+def _slot_entry(slot_id):
+    return _calendar.setdefault(slot_id, {"starts": [], "ends": [], "owners": []})
+
+def _first_overlap(entry, start, end):
+    # Index of the first interval ending after `start`; it overlaps iff it begins before `end`
+    i = bisect_right(entry["ends"], start)
+    if i < len(entry["starts"]) and entry["starts"][i] < end:
+        return i
+    return None
+
+def has_conflict(slot_id, start, end, owner=None):
+    ensure_loaded()
+    entry = _calendar.get(slot_id)
+    if not entry:
+        return False
+    i = _first_overlap(entry, start, end)
+    if i is None:
+        return False
+    if owner is None:
+        return True
+    # Overlaps held by the same owner don't block them
+    while i < len(entry["starts"]) and entry["starts"][i] < end:
+        if entry["owners"][i] != owner:
+            return True
+        i += 1
+    return False
+
+def reserve(slot_id, start, end, owner):
+    if end <= start:
+        raise ValueError("Reservation must end after it starts.")
+    ensure_loaded()
+    with _lock:
+        entry = _slot_entry(slot_id)
+        if _first_overlap(entry, start, end) is not None:
+            return False
+        i = bisect_left(entry["starts"], start)
+        entry["starts"].insert(i, start)
+        entry["ends"].insert(i, end)
+        entry["owners"].insert(i, owner)
+    return True
+
+def cancel(slot_id, owner=None, start=None):
+    ensure_loaded()
+    with _lock:
+        entry = _calendar.get(slot_id)
+        if not entry:
+            return 0
+        keep = [
+            i for i in range(len(entry["starts"]))
+            if not ((owner is None or entry["owners"][i] == owner)
+                    and (start is None or entry["starts"][i] == start))
+        ]
+        removed = len(entry["starts"]) - len(keep)
+        for key in ("starts", "ends", "owners"):
+            entry[key] = [entry[key][i] for i in keep]
+    return removed
+
+def free_slots(slot_ids, start, end, owner=None):
+    return [slot_id for slot_id in slot_ids if not has_conflict(slot_id, start, end, owner)]
+
+def upcoming_reservations(slot_id, after=None):
+    ensure_loaded()
+    after = after or datetime.now()
+    entry = _calendar.get(slot_id)
+    if not entry:
+        return []
+    i = bisect_right(entry["ends"], after)
+    return list(zip(entry["starts"][i:], entry["ends"][i:], entry["owners"][i:]))
+
+def purge_before(cutoff):
+    with _lock:
+        for entry in _calendar.values():
+            i = bisect_right(entry["ends"], cutoff)
+            for key in ("starts", "ends", "owners"):
+                del entry[key][:i]
+
+# ==================== LOADING ====================
+def load_reservations(csv_path=USER_CSV):
+    global _loaded
+    with _lock:
+        _calendar.clear()
+        _loaded = True
+    columns = {"User_ID", "Prebooked_Slot", "Booking_Start", "Booking_End"}
+    if not os.path.exists(csv_path):
+        return
+    df = pd.read_csv(csv_path, usecols=lambda c: c in columns)
+    if not columns.issubset(df.columns):
+        return
+
+    df = df.dropna(subset=["Prebooked_Slot", "Booking_Start", "Booking_End"])
+    starts = pd.to_datetime(df["Booking_Start"], errors="coerce")
+    ends = pd.to_datetime(df["Booking_End"], errors="coerce")
+    for slot_id, start, end, owner in zip(df["Prebooked_Slot"], starts, ends, df["User_ID"]):
+        if pd.isna(start) or pd.isna(end) or end <= start:
+            continue
+        if not reserve(slot_id, start.to_pydatetime(), end.to_pydatetime(), owner):
+            print(f"⚠️ Overlapping reservation for {slot_id} ({owner}) skipped.")
+
+def ensure_loaded():
+    if not _loaded:
+        load_reservations()
@@ -0,0 +1,228 @@
+import os
+import io
+import time
+import heapq
+import shutil
+import argparse
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+
+import slot_utils
+from slot_utils import assign_slot, release_slot
+from plate_registry import VEHICLE_CLASS
+from user_auth import register_user, login_user
+from vehicle_utils import calculate_bill
+from snapshot import load_frame
+
+VEHICLE_CSV = "vehicle_information_dataset_extended.csv"
+PROFILE_CSV = "user_authentication_dataset_extended.csv"
+DATA_FILES = [slot_utils.SLOT_CSV, slot_utils.USER_CSV]
+
+# Roles in the extended dataset -> roles known to billing/booking
+ROLE_MAP = {"admin": "official", "user": "user"}
+
+# ==================== WORKLOAD ====================
+def load_workload(data_dir="."):
+    vehicles = load_frame(os.path.join(data_dir, VEHICLE_CSV))
+    profiles = load_frame(os.path.join(data_dir, PROFILE_CSV))
+    car_types = vehicles["vehicle_type"].str.lower().map(VEHICLE_CLASS).fillna("Sedan")
+    roles = profiles["Role"].str.lower().map(ROLE_MAP).fillna("user")
+    return {
+        "car_types": car_types.to_numpy(),
+        "roles": roles.to_numpy(),
+        "durations_hrs": profiles["Duration_Hrs"].dropna().to_numpy(dtype=float)
+    }
+
+def generate_arrivals(workload, arrivals_per_hour, hours, seed=None):
+    rng = np.random.default_rng(seed)
+    gaps = rng.exponential(3600.0 / arrivals_per_hour, int(arrivals_per_hour * hours * 1.5) + 10)
+    times = np.cumsum(gaps)
+    times = times[times < hours * 3600]
+    n = len(times)
+    return [
+        {
+            "driver": i,
+            "arrival": float(times[i]),
+            "stay": float(stay),
+            "car_type": car_type,
+            "role": role,
+            "plate": f"SIM{i:06d}"
+        }
+        for i, (car_type, role, stay) in enumerate(zip(
+            rng.choice(workload["car_types"], n),
+            rng.choice(workload["roles"], n),
+            rng.choice(workload["durations_hrs"], n) * 3600 * rng.uniform(0.5, 1.5, n)
+        ))
+    ]
+
+# ==================== DRIVER ====================
+class Simulation:
+    def __init__(self, concurrency=4, sim_start=None):
+        self.concurrency = concurrency
+        self.sim_start = sim_start or datetime.now().replace(hour=6, minute=0, second=0, microsecond=0)
+        self.latencies = {}
+        self.setup_latencies = {}
+        self.counts = {"arrivals": 0, "assigned": 0, "allocation_failures": 0, "released": 0,
+                       "double_bookings": 0, "errors": 0}
+        self.error_types = {}
+        self.revenue = 0.0
+        self.active_slots = {}  # slot_id -> plate, as the simulator believes it
+        self._lock = threading.Lock()
+
+    def _timed(self, op, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.latencies.setdefault(op, []).append(elapsed)
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counts[key] += n
+
+    def _assign(self, driver, user_id):
+        return assign_slot(driver["plate"], user_id, driver["role"], car_type=driver["car_type"])
+
+    def _release(self, driver):
+        return release_slot(driver["plate"])
+
+    def register_drivers(self, arrivals):
+        # Serial setup: the user CSV is rewritten on every registration, so concurrent
+        # sign-ups would measure torn reads of the harness rather than the booking path
+        for driver in arrivals:
+            email = f"sim{driver['driver']}@parkour.test"
+            self._timed("register", register_user, f"Sim Driver {driver['driver']}", "0000000000",
+                        email, "sim-pass", driver["role"])
+            user = self._timed("login", login_user, email, "sim-pass")
+            driver["user_id"] = user["User_ID"] if user else f"sim_{driver['driver']}"
+
+    def arrive(self, driver):
+        self._count("arrivals")
+        user_id = driver["user_id"]
+
+        slot_id = self._timed("assign", self._assign, driver, user_id)
+        if not slot_id:
+            self._count("allocation_failures")
+            return False
+
+        with self._lock:
+            if slot_id in self.active_slots:
+                self.counts["double_bookings"] += 1
+            self.active_slots[slot_id] = driver["plate"]
+        self._count("assigned")
+        driver["slot"] = slot_id
+        return True
+
+    def depart(self, driver):
+        check_in = self.sim_start + timedelta(seconds=driver["arrival"])
+        check_out = check_in + timedelta(seconds=driver["stay"])
+        bill = self._timed("bill", calculate_bill, check_in, check_out, driver["role"])
+        with self._lock:
+            # Forget the slot before it is freed, or a same-batch arrival taking it looks like a double booking
+            self.revenue += bill
+            if self.active_slots.get(driver["slot"]) == driver["plate"]:
+                del self.active_slots[driver["slot"]]
+        released = self._timed("release", self._release, driver)
+        if released:
+            self._count("released")
+
+    def _run_event(self, kind, driver):
+        try:
+            if kind == "arrive":
+                return self.arrive(driver)
+            self.depart(driver)
+        except Exception as e:
+            with self._lock:
+                self.counts["errors"] += 1
+                name = type(e).__name__
+                self.error_types[name] = self.error_types.get(name, 0) + 1
+        return False
+
+    def run(self, arrivals):
+        self.register_drivers(arrivals)
+        self.setup_latencies, self.latencies = self.latencies, {}
+
+        # Events are processed in simulated-time order, `concurrency` at a time
+        events = [(d["arrival"], i, "arrive", d) for i, d in enumerate(arrivals)]
+        heapq.heapify(events)
+        seq = len(events)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while events:
+                batch = [heapq.heappop(events) for _ in range(min(self.concurrency, len(events)))]
+                results = list(pool.map(lambda e: self._run_event(e[2], e[3]), batch))
+                for (_, _, kind, driver), ok in zip(batch, results):
+                    if kind == "arrive" and ok:
+                        heapq.heappush(events, (driver["arrival"] + driver["stay"], seq, "depart", driver))
+                        seq += 1
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        operations = sum(len(v) for v in self.latencies.values())
+        latency = {
+            op: {f"p{p}_ms": round(float(np.percentile(values, p)) * 1000, 2) for p in (50, 95, 99)}
+            for op, values in sorted({**self.setup_latencies, **self.latencies}.items())
+        }
+        return {
+            "shards": len(slot_utils.load_slot_store().shards),
+            "concurrency": self.concurrency,
+            "wall_time_s": round(elapsed, 3),
+            "operations": operations,
+            "throughput_ops_s": round(operations / elapsed, 1) if elapsed else 0.0,
+            **self.counts,
+            "error_types": dict(self.error_types),
+            "revenue": round(self.revenue, 2),
+            "latency": latency
+        }
+
+# ==================== ENTRY POINT ====================
+@contextlib.contextmanager
+def sandbox(data_dir="."):
+    # Run against throwaway copies of the datasets so real CSVs are never touched
+    data_dir = os.path.abspath(data_dir)
+    workdir = tempfile.mkdtemp(prefix="parkour_sim_")
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(data_dir, name), workdir)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        yield workdir
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+def simulate(arrivals_per_hour=60, hours=4, concurrency=4, seed=42,
+             data_dir=".", reset_slots=True, quiet=True):
+    workload = load_workload(data_dir)
+    arrivals = generate_arrivals(workload, arrivals_per_hour, hours, seed)
+    with sandbox(data_dir):
+        output = io.StringIO() if quiet else None
+        with contextlib.redirect_stdout(output) if quiet else contextlib.nullcontext():
+            if reset_slots:
+                slot_utils.clear_all_slots()
+            simulation = Simulation(concurrency)
+            return simulation.run(arrivals)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless load test for the Parkour booking pipeline")
+    parser.add_argument("--rate", type=float, default=60, help="arrivals per simulated hour")
+    parser.add_argument("--hours", type=float, default=4, help="simulated hours")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = simulate(args.rate, args.hours, args.concurrency, args.seed)
+    latency = result.pop("latency")
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    print("latency:")
+    for op, stats in latency.items():
+        print(f"  {op}: {stats}")
@@ -0,0 +1,319 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from metrics import read_csv, write_csv, timed
+from slot_store import SlotTable, AVAILABLE, OCCUPIED
+
+SITE_COLUMN = "Site"
+DEFAULT_SITE = "main"
+ORDER_COLUMN = "_row"
+
+# 🧩 One shard per (site, level): its own table, indexes and lock. slot_utils keeps the
+# live store here, so a booking only ever locks the shard that owns its slot; the
+# cross-shard aggregates and the vehicle directory sit behind their own tiny locks.
+class SlotShard:
+    __slots__ = ("site", "level", "table", "rows", "lock")
+
+    def __init__(self, site, level, df):
+        self.site = site
+        self.level = level
+        self.rows = df[ORDER_COLUMN].to_numpy()
+        self.table = SlotTable.from_dataframe(df)
+        self.lock = threading.Lock()
+
+    @property
+    def key(self):
+        return self.site, self.level
+
+    def free_counts(self):
+        mask = self.table.available_mask()
+        codes, counts = np.unique(self.table.type_codes[mask], return_counts=True)
+        return {self.table.types[c]: int(n) for c, n in zip(codes, counts)}
+
+    def candidates(self, car_dims=None, slot_type=None):
+        # Available rows that fit, as (rows, slack); call under self.lock
+        mask = self.table.available_mask(slot_type=slot_type)
+        if car_dims is not None:
+            mask &= self.table.fits_mask(car_dims)
+        rows = np.flatnonzero(mask)
+        if car_dims is None:
+            return rows, np.zeros(len(rows), dtype=np.float32)
+        needed = np.array([car_dims["length"], car_dims["width"], car_dims["height"]], dtype=np.float32)
+        return rows, (self.table.dims[rows] - needed).sum(axis=1)
+
+    def best_candidate(self, car_dims=None, slot_type=None):
+        # Tightest fit first so large slots stay free for large vehicles; call under self.lock
+        rows, slack = self.candidates(car_dims, slot_type)
+        if not len(rows):
+            return None
+        best = int(np.argmin(slack))
+        return float(slack[best]), str(self.table.ids[rows[best]])
+
+class ShardedSlotStore:
+    def __init__(self, df):
+        df = df.reset_index(drop=True)
+        df[ORDER_COLUMN] = np.arange(len(df))
+        if SITE_COLUMN not in df.columns:
+            df[SITE_COLUMN] = DEFAULT_SITE
+        df[SITE_COLUMN] = df[SITE_COLUMN].fillna(DEFAULT_SITE)
+        df["Level"] = df["Level"].fillna("Unknown")
+
+        self.shards = {
+            (site, level): SlotShard(site, level, group)
+            for (site, level), group in df.groupby([SITE_COLUMN, "Level"], sort=True)
+        }
+        # Slot -> shard never changes after load, so lookups need no lock
+        self._slot_shard = {
+            slot_id: shard for shard in self.shards.values() for slot_id in shard.table.ids.tolist()
+        }
+
+        # 📊 Cross-shard aggregates and vehicle routing, each behind a tiny lock
+        self._agg_lock = threading.Lock()
+        self._free = {}
+        self._dir_lock = threading.Lock()
+        self._vehicle_shard = {}
+        self._rebuild_indexes()
+
+    def _rebuild_indexes(self):
+        free, vehicles = {}, {}
+        for shard in self.shards.values():
+            with shard.lock:
+                for slot_type, count in shard.free_counts().items():
+                    free[(shard.site, shard.level, slot_type)] = count
+                vehicles.update((v, shard.key) for v in shard.table.vehicles.tolist() if v)
+        with self._agg_lock:
+            self._free = free
+        with self._dir_lock:
+            self._vehicle_shard = vehicles
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls(read_csv(path, dtype={"Vehicle": str, "User_ID": str}))
+
+    def to_dataframe(self):
+        # Each shard is copied under its own lock, one at a time
+        parts = []
+        for shard in self.shards.values():
+            with shard.lock:
+                part = shard.table.to_dataframe()
+            part[SITE_COLUMN] = shard.site
+            part[ORDER_COLUMN] = shard.rows
+            parts.append(part)
+        df = pd.concat(parts).sort_values(ORDER_COLUMN).drop(columns=ORDER_COLUMN)
+        if set(df[SITE_COLUMN]) == {DEFAULT_SITE}:
+            df = df.drop(columns=SITE_COLUMN)
+        return df.reset_index(drop=True)
+
+    def save(self, path):
+        write_csv(self.to_dataframe(), path)
+
+    # ==================== LOOKUPS ====================
+    def shard_of(self, slot_id):
+        return self._slot_shard.get(slot_id)
+
+    def _read(self, slot_id, getter, default=None):
+        shard = self.shard_of(slot_id)
+        if shard is None:
+            return default
+        with shard.lock:
+            return getter(shard.table, shard.table.row_of(slot_id))
+
+    def status_of(self, slot_id):
+        return self._read(slot_id, lambda t, row: t.statuses[t.status_codes[row]])
+
+    def level_of(self, slot_id):
+        shard = self.shard_of(slot_id)
+        return shard.level if shard is not None else "Unknown"
+
+    def type_of(self, slot_id):
+        return self._read(slot_id, lambda t, row: t.types[t.type_codes[row]], "Unknown")
+
+    def user_of(self, slot_id):
+        return self._read(slot_id, lambda t, row: t.users[row])
+
+    def dims_of(self, slot_id):
+        return self._read(slot_id, lambda t, row: t.dims[row].copy())
+
+    def check_in_of(self, slot_id):
+        shard = self.shard_of(slot_id)
+        if shard is None:
+            return None
+        with shard.lock:
+            return shard.table.check_in_of(slot_id)
+
+    def find_vehicle(self, vehicle):
+        with self._dir_lock:
+            key = self._vehicle_shard.get(vehicle)
+        if key is None:
+            return None
+        shard = self.shards[key]
+        with shard.lock:
+            return shard.table.find_vehicle(vehicle)
+
+    def levels(self):
+        return sorted({level for _, level in self.shards})
+
+    def all_ids(self):
+        return self.to_dataframe()["Slot_ID"].tolist() if self.shards else []
+
+    def candidates(self, car_dims=None, slot_type=None, site=None, level=None):
+        # Available slots that fit across the matching shards, in CSV row order: (ids, dims, slack)
+        ids, dims, slack, order = [], [], [], []
+        for shard in self._shards_for(site, level):
+            with shard.lock:
+                rows, shard_slack = shard.candidates(car_dims, slot_type)
+                ids.append(shard.table.ids[rows])
+                dims.append(shard.table.dims[rows])
+            slack.append(shard_slack)
+            order.append(shard.rows[rows])
+        if not ids:
+            return np.array([], dtype=str), np.zeros((0, 3), dtype=np.float32), np.zeros(0, dtype=np.float32)
+        sort = np.argsort(np.concatenate(order), kind="stable")
+        return np.concatenate(ids)[sort], np.concatenate(dims)[sort], np.concatenate(slack)[sort]
+
+    def available_ids(self, level=None, slot_type=None):
+        return self.candidates(slot_type=slot_type, level=level)[0].tolist()
+
+    def count(self, status=AVAILABLE):
+        total = 0
+        for shard in self.shards.values():
+            with shard.lock:
+                total += int(shard.table.status_mask(status).sum())
+        return total
+
+    # ==================== AGGREGATES ====================
+    def _adjust(self, shard, slot_type, delta):
+        key = (shard.site, shard.level, slot_type)
+        with self._agg_lock:
+            self._free[key] = self._free.get(key, 0) + delta
+
+    def free_count(self, site=None, level=None, slot_type=None):
+        with self._agg_lock:
+            return sum(
+                count for (s, l, t), count in self._free.items()
+                if (site is None or s == site) and (level is None or l == level)
+                and (slot_type is None or t == slot_type)
+            )
+
+    def free_counts(self):
+        with self._agg_lock:
+            return dict(self._free)
+
+    # ==================== UPDATES ====================
+    def set_slot(self, slot_id, status, vehicle, user_id, expected_status=None):
+        # Compare-and-set on the owning shard only; returns the previous status, or None if nothing was written
+        shard = self.shard_of(slot_id)
+        if shard is None:
+            return None
+        with shard.lock:
+            table = shard.table
+            row = table.row_of(slot_id)
+            previous = table.statuses[table.status_codes[row]]
+            if expected_status is not None and previous != expected_status:
+                return None
+            old_vehicle = table.vehicles[row]
+            table.set_slot(slot_id, status, vehicle, user_id)
+            # Directory and free counts move with the table, before the shard lock is released
+            with self._dir_lock:
+                if old_vehicle and old_vehicle != vehicle and table.find_vehicle(old_vehicle) is None:
+                    self._vehicle_shard.pop(old_vehicle, None)
+                if vehicle:
+                    self._vehicle_shard[vehicle] = shard.key
+            if (previous == AVAILABLE) != (status == AVAILABLE):
+                self._adjust(shard, table.types[table.type_codes[row]], 1 if status == AVAILABLE else -1)
+        return previous
+
+    def clear_all(self):
+        # Frees every slot; returns the slot ids that were occupied
+        freed = []
+        for shard in self.shards.values():
+            with shard.lock:
+                freed.extend(shard.table.ids[shard.table.clear_all()].tolist())
+        self._rebuild_indexes()
+        return freed
+
+    # ==================== ALLOCATION ====================
+    def _shards_for(self, site=None, level=None):
+        return [
+            shard for (s, l), shard in self.shards.items()
+            if (site is None or s == site) and (level is None or l == level)
+        ]
+
+    def _probe(self, shard, car_dims, slot_type):
+        with shard.lock:
+            return shard.best_candidate(car_dims, slot_type)
+
+    @timed("parkour_allocator_seconds", allocator="sharded")
+    def allocate(self, vehicle, user_id, car_dims=None, site=None, level=None, slot_type=None):
+        if self.find_vehicle(vehicle) is not None:
+            return None
+        while True:
+            # Probe each shard's best fit (one lock at a time), then claim the best by compare-and-set
+            shards = [s for s in self._shards_for(site, level) if self.free_count(s.site, s.level, slot_type) > 0]
+            ranked = sorted(
+                (probe[0], -self.free_count(shard.site, shard.level), probe[1])
+                for shard, probe in ((s, self._probe(s, car_dims, slot_type)) for s in shards)
+                if probe is not None
+            )
+            if not ranked:
+                return None
+            for _, _, slot_id in ranked:
+                if self.set_slot(slot_id, OCCUPIED, vehicle, user_id, expected_status=AVAILABLE) is not None:
+                    return slot_id
+            # Every probed slot was taken meanwhile: probe again
+
+    def allocate_many(self, requests, workers=8):
+        # requests: iterable of dicts with allocate() keyword arguments
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alloc") as pool:
+            return list(pool.map(lambda r: self.allocate(**r), requests))
+
+    def release(self, vehicle):
+        slot_id = self.find_vehicle(vehicle)
+        if slot_id is None:
+            return None
+        if self.set_slot(slot_id, AVAILABLE, "", "", expected_status=OCCUPIED) is None:
+            return None
+        return slot_id
+
+# 🧪 Benchmark: concurrent allocations across a synthetic multi-site garage (in memory; the
+# threads share the GIL, so this measures lock contention, not multi-core speed-up)
+def benchmark_shards(n_sites=4, levels=("L1", "L2", "L3"), slots_per_level=5000, n_requests=20000, seed=11):
+    rng = np.random.default_rng(seed)
+    n_slots = n_sites * len(levels) * slots_per_level
+    df = pd.DataFrame({
+        "Slot_ID": [f"SLOT{i + 1}" for i in range(n_slots)],
+        "Site": np.repeat([f"site{i + 1}" for i in range(n_sites)], len(levels) * slots_per_level),
+        "Level": np.tile(np.repeat(list(levels), slots_per_level), n_sites),
+        "Type": rng.choice(["Normal", "Electric"], n_slots, p=[0.8, 0.2]),
+        "Status": AVAILABLE,
+        "Vehicle": None,
+        "User_ID": None,
+        "Max_Length": np.round(rng.uniform(3.5, 7.0, n_slots), 2),
+        "Max_Width": np.round(rng.uniform(1.6, 2.5, n_slots), 2),
+        "Max_Height": np.round(rng.uniform(1.5, 2.5, n_slots), 2)
+    })
+    store = ShardedSlotStore(df)
+    sites = rng.integers(1, n_sites + 1, n_requests)
+    requests = [
+        {"vehicle": f"V{i}", "user_id": f"user_{i}", "site": f"site{sites[i]}",
+         "car_dims": {"length": 4.5, "width": 1.8, "height": 1.5}}
+        for i in range(n_requests)
+    ]
+
+    start = time.time()
+    results = store.allocate_many(requests)
+    elapsed = time.time() - start
+
+    assigned = [r for r in results if r]
+    return {
+        "slots": n_slots,
+        "shards": len(store.shards),
+        "allocated": len(assigned),
+        "duplicates": len(assigned) - len(set(assigned)),
+        "throughput_per_s": round(len(results) / elapsed, 1)
+    }
+
+if __name__ == "__main__":
+    print(benchmark_shards())
@@ -0,0 +1,245 @@
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from metrics import read_csv, write_csv
+
+SLOT_COLUMNS = ["Slot_ID", "Level", "Type", "Status", "Vehicle", "User_ID", "Max_Length", "Max_Width", "Max_Height", "Check_In"]
+DIM_COLUMNS = ["Max_Length", "Max_Width", "Max_Height"]
+CHECK_IN_COLUMN = "Check_In"
+NO_CHECK_IN = 0  # check_ins holds datetime64[s] as int64; 0 = not recorded
+
+AVAILABLE = "Available"
+OCCUPIED = "Occupied"
+
+def _code_dtype(n_labels):
+    # Narrowest signed dtype that holds every code (int8 wraps past 127 labels)
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_labels <= np.iinfo(dtype).max + 1:
+            return dtype
+    return np.int64
+
+def _intern(values):
+    # Small categorical columns -> compact integer codes + lookup list
+    labels, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return labels.tolist(), codes.astype(_code_dtype(len(labels)))
+
+def _code_for(labels, value):
+    if value not in labels:
+        labels.append(value)
+    return labels.index(value)
+
+def _fit_codes(codes, labels):
+    # Widen a code column once runtime labels outgrow its dtype
+    dtype = _code_dtype(len(labels))
+    return codes if np.iinfo(codes.dtype).max >= np.iinfo(dtype).max else codes.astype(dtype)
+
+# 🗃️ Array-backed slot table: one entry per column, no per-row Python objects
+class SlotTable:
+    __slots__ = ("ids", "levels", "level_codes", "types", "type_codes", "statuses", "status_codes",
+                 "vehicles", "users", "dims", "check_ins", "_row_of", "_row_of_vehicle")
+
+    def __init__(self, ids, levels, level_codes, types, type_codes, statuses, status_codes,
+                 vehicles, users, dims, check_ins=None):
+        self.ids = ids
+        self.levels = levels
+        self.level_codes = level_codes
+        self.types = types
+        self.type_codes = type_codes
+        self.statuses = statuses
+        self.status_codes = status_codes
+        self.vehicles = vehicles
+        self.users = users
+        self.dims = dims
+        self.check_ins = check_ins if check_ins is not None else np.full(len(ids), NO_CHECK_IN, dtype=np.int64)
+        self._row_of = {slot_id: i for i, slot_id in enumerate(ids.tolist())}
+        self._row_of_vehicle = {v: i for i, v in enumerate(vehicles.tolist()) if v}
+
+    def __len__(self):
+        return len(self.ids)
+
+    # ==================== CONVERSION ====================
+    @classmethod
+    def from_dataframe(cls, df):
+        levels, level_codes = _intern(df["Level"].fillna("Unknown"))
+        types, type_codes = _intern(df["Type"].fillna("Normal"))
+        statuses, status_codes = _intern(df["Status"].fillna(AVAILABLE))
+        for status in (AVAILABLE, OCCUPIED):
+            _code_for(statuses, status)
+
+        def text(column):
+            values = df[column].astype(object).where(df[column].notna(), "").astype(str)
+            return np.array([sys.intern(v) if v else "" for v in values], dtype=object)
+
+        check_ins = None
+        if CHECK_IN_COLUMN in df.columns:
+            stamps = pd.to_datetime(df[CHECK_IN_COLUMN], errors="coerce")
+            check_ins = np.where(stamps.notna(), stamps.to_numpy(dtype="datetime64[s]").astype(np.int64), NO_CHECK_IN)
+
+        return cls(
+            ids=df["Slot_ID"].to_numpy(dtype=str),
+            levels=levels, level_codes=level_codes,
+            types=types, type_codes=type_codes,
+            statuses=statuses, status_codes=status_codes,
+            vehicles=text("Vehicle"),
+            users=text("User_ID"),
+            dims=df[DIM_COLUMNS].to_numpy(dtype=np.float32),
+            check_ins=check_ins
+        )
+
+    @classmethod
+    def from_csv(cls, path):
+        return cls.from_dataframe(read_csv(path, dtype={"Vehicle": str, "User_ID": str}))
+
+    def to_dataframe(self, rows=None):
+        rows = slice(None) if rows is None else rows
+        df = pd.DataFrame({
+            "Slot_ID": self.ids[rows],
+            "Level": np.array(self.levels, dtype=object)[self.level_codes[rows]],
+            "Type": np.array(self.types, dtype=object)[self.type_codes[rows]],
+            "Status": np.array(self.statuses, dtype=object)[self.status_codes[rows]],
+            "Vehicle": self.vehicles[rows],
+            "User_ID": self.users[rows]
+        })
+        for i, column in enumerate(DIM_COLUMNS):
+            df[column] = np.round(self.dims[rows, i].astype(np.float64), 2)
+        stamps = self.check_ins[rows]
+        text = np.char.replace(np.datetime_as_string(stamps.astype("datetime64[s]")), "T", " ")
+        df[CHECK_IN_COLUMN] = np.where(stamps != NO_CHECK_IN, text, "")
+        return df
+
+    def to_csv(self, path):
+        write_csv(self.to_dataframe(), path)
+
+    # ==================== QUERIES ====================
+    def status_mask(self, status=AVAILABLE):
+        return self.status_codes == _code_for(self.statuses, status)
+
+    def available_mask(self, level=None, slot_type=None):
+        mask = self.status_mask(AVAILABLE)
+        if level is not None:
+            mask &= self.level_codes == (self.levels.index(level) if level in self.levels else -1)
+        if slot_type is not None:
+            mask &= self.type_codes == (self.types.index(slot_type) if slot_type in self.types else -1)
+        return mask
+
+    def fits_mask(self, car_dims):
+        needed = np.array([car_dims["length"], car_dims["width"], car_dims["height"]], dtype=np.float32)
+        return (self.dims >= needed).all(axis=1)
+
+    def available_ids(self, level=None, slot_type=None):
+        return self.ids[self.available_mask(level, slot_type)].tolist()
+
+    def all_ids(self):
+        return self.ids.tolist()
+
+    def row_of(self, slot_id):
+        return self._row_of.get(slot_id)
+
+    def row_of_vehicle(self, vehicle):
+        return self._row_of_vehicle.get(vehicle)
+
+    def level_of(self, slot_id):
+        row = self.row_of(slot_id)
+        return self.levels[self.level_codes[row]] if row is not None else "Unknown"
+
+    def type_of(self, slot_id):
+        row = self.row_of(slot_id)
+        return self.types[self.type_codes[row]] if row is not None else "Unknown"
+
+    def status_of(self, slot_id):
+        row = self.row_of(slot_id)
+        return self.statuses[self.status_codes[row]] if row is not None else None
+
+    def find_vehicle(self, vehicle):
+        row = self.row_of_vehicle(vehicle)
+        return str(self.ids[row]) if row is not None else None
+
+    def check_in_of(self, slot_id):
+        row = self.row_of(slot_id)
+        if row is None or self.check_ins[row] == NO_CHECK_IN:
+            return None
+        return np.datetime64(int(self.check_ins[row]), "s").astype(datetime)
+
+    # ==================== UPDATES ====================
+    def set_slot(self, slot_id, status, vehicle, user_id, check_in=None):
+        row = self.row_of(slot_id)
+        if row is None:
+            return False
+        old_vehicle = self.vehicles[row]
+        if old_vehicle and self._row_of_vehicle.get(old_vehicle) == row:
+            del self._row_of_vehicle[old_vehicle]
+        code = _code_for(self.statuses, status)
+        self.status_codes = _fit_codes(self.status_codes, self.statuses)
+        self.status_codes[row] = code
+        self.vehicles[row] = vehicle or ""
+        self.users[row] = user_id or ""
+        if vehicle:
+            self._row_of_vehicle[vehicle] = row
+        # ⏱️ Occupying stamps the check-in (kept if the slot was already held); anything else clears it
+        if status == OCCUPIED:
+            if check_in is not None or self.check_ins[row] == NO_CHECK_IN or old_vehicle != (vehicle or ""):
+                stamp = np.datetime64(check_in or datetime.now(), "s")
+                self.check_ins[row] = stamp.astype(np.int64)
+        else:
+            self.check_ins[row] = NO_CHECK_IN
+        return True
+
+    def clear_all(self):
+        occupied = np.flatnonzero(self.status_mask(OCCUPIED))
+        code = _code_for(self.statuses, AVAILABLE)
+        self.status_codes = _fit_codes(self.status_codes, self.statuses)
+        self.status_codes[:] = code
+        self.vehicles[:] = ""
+        self.users[:] = ""
+        self._row_of_vehicle.clear()
+        self.check_ins[:] = NO_CHECK_IN
+        return occupied
+
+    def nbytes(self):
+        strings = {v for v in self.vehicles.tolist() if v} | {u for u in self.users.tolist() if u}
+        return (self.ids.nbytes + self.level_codes.nbytes + self.type_codes.nbytes
+                + self.status_codes.nbytes + self.vehicles.nbytes + self.users.nbytes + self.dims.nbytes
+                + self.check_ins.nbytes
+                + sum(sys.getsizeof(v) for v in strings))
+
+# 🧪 Benchmark: DataFrame vs SlotTable on a synthetic multi-site inventory
+def benchmark_slot_table(n_slots=300_000, seed=3):
+    rng = np.random.default_rng(seed)
+    occupied = rng.random(n_slots) < 0.6
+    df = pd.DataFrame({
+        "Slot_ID": [f"SLOT{i + 1}" for i in range(n_slots)],
+        "Level": rng.choice(["L1", "L2", "L3"], n_slots),
+        "Type": rng.choice(["Normal", "Electric"], n_slots, p=[0.8, 0.2]),
+        "Status": np.where(occupied, OCCUPIED, AVAILABLE),
+        "Vehicle": np.where(occupied, [f"TN01AB{i:04d}" for i in range(n_slots)], None),
+        "User_ID": np.where(occupied, [f"user_{i}" for i in range(n_slots)], None),
+        "Max_Length": np.round(rng.uniform(3.5, 7.0, n_slots), 2),
+        "Max_Width": np.round(rng.uniform(1.6, 2.5, n_slots), 2),
+        "Max_Height": np.round(rng.uniform(1.5, 2.5, n_slots), 2)
+    })
+    table = SlotTable.from_dataframe(df)
+    car = {"length": 4.5, "width": 1.8, "height": 1.5}
+
+    start = time.time()
+    for _ in range(20):
+        df[(df["Status"] == AVAILABLE) & (df["Max_Length"] >= car["length"])
+           & (df["Max_Width"] >= car["width"]) & (df["Max_Height"] >= car["height"])]["Slot_ID"].tolist()
+    df_time = (time.time() - start) / 20
+
+    start = time.time()
+    for _ in range(20):
+        table.ids[table.available_mask() & table.fits_mask(car)].tolist()
+    table_time = (time.time() - start) / 20
+
+    return {
+        "slots": n_slots,
+        "dataframe_mb": round(float(df.memory_usage(deep=True).sum()) / 1e6, 1),
+        "table_mb": round(table.nbytes() / 1e6, 1),
+        "dataframe_scan_s": round(df_time, 4),
+        "table_scan_s": round(table_time, 4)
+    }
+
+if __name__ == "__main__":
+    print(benchmark_slot_table())
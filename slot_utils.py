@@ -1,4 +1,6 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
@@ -6,6 +8,13 @@ from typing import Optional
 import pennylane as qml
 import time
 import math
+from occupancy_history import record_occupy, record_release
+from reservations import RESERVATION_HORIZON, free_slots, reserve, cancel
+from metrics import read_csv, write_csv, timer
+from slot_store import AVAILABLE, OCCUPIED
+from slot_shards import ShardedSlotStore
+from plate_registry import lookup_plate
+from availability_feed import FEED, OCCUPY, RELEASE
 
 SLOT_CSV = "updated_parking_slots_with_dimensions.csv"
 USER_CSV = "user_authentication_dataset.csv"
@@ -18,51 +27,126 @@ CAR_DIMENSIONS = {
     "Truck": {"length": 5.5, "width": 2.2, "height": 2.2}
 }
 
+# 🗃️ In-memory sharded slot store (one table + lock per site/level), reloaded only when
+# the CSV changes on disk. _cache_lock guards the reload, never a booking.
+_slot_cache = {"store": None, "mtime": None}
+_cache_lock = threading.Lock()
+
+# 💾 All slot CSV writes go through one worker, in order: back-to-back saves coalesce into one write,
+# and an older snapshot can never land on disk after a newer one
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slot-writer")
+_pending_save = {"future": None, "store": None, "last": None}
+_save_lock = threading.Lock()
+
 def ensure_slot_csv():
     if not os.path.exists(SLOT_CSV):
         print("⚠️ Slot CSV not found. Please add the dataset.")
         return
 
-def get_all_slot_ids():
+def load_slot_store() -> ShardedSlotStore:
     ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    return df['Slot_ID'].unique().tolist()
+    mtime = (os.path.abspath(SLOT_CSV), os.stat(SLOT_CSV).st_mtime_ns)
+    store = _slot_cache["store"]
+    if store is not None and _slot_cache["mtime"] == mtime:
+        return store
+    with _cache_lock:
+        last = _pending_save["last"]
+        stale = _slot_cache["mtime"] != mtime and (last is None or last.done())
+        if _slot_cache["store"] is None or stale:
+            _slot_cache["store"] = ShardedSlotStore.from_csv(SLOT_CSV)
+            _slot_cache["mtime"] = mtime
+            if FEED.seeded:
+                # Changed behind our back (another process): resync screens in one event
+                FEED.reset(_slot_cache["store"])
+        return _slot_cache["store"]
+
+def save_slot_store(store: ShardedSlotStore):
+    # Synchronous save: queued on the same writer as schedule_save, then waited on
+    schedule_save(store).result()
+
+def _write_behind(store: ShardedSlotStore, path: str):
+    with _save_lock:
+        if _pending_save["store"] is store:
+            _pending_save["future"] = None  # changes from here on schedule a fresh save
+    df = store.to_dataframe()
+    tmp_path = f"{path}.tmp"
+    write_csv(df, tmp_path)
+    with _cache_lock:
+        os.replace(tmp_path, path)
+        if _slot_cache["store"] is store:
+            _slot_cache["mtime"] = (path, os.stat(path).st_mtime_ns)
+
+def schedule_save(store: ShardedSlotStore):
+    with _save_lock:
+        future = _pending_save["future"]
+        if future is None or _pending_save["store"] is not store:
+            future = _writer.submit(_write_behind, store, os.path.abspath(SLOT_CSV))
+            _pending_save.update(future=future, store=store, last=future)
+        return future
+
+def flush_slot_writes():
+    # Waits for the last submitted write, including one already running
+    future = _pending_save["last"]
+    if future is not None:
+        future.result()
+
+def get_availability_feed():
+    # 📣 Push-based alternative to polling get_available_slot_ids / show_available_slots
+    store = load_slot_store()
+    if not FEED.seeded:
+        FEED.reset(store)
+    return FEED
 
-def get_available_slot_ids():
-    ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    available_ids = df[df["Status"] == "Available"]["Slot_ID"].tolist()
-    return available_ids
+def get_all_slot_ids():
+    return load_slot_store().all_ids()
+
+def get_available_slot_ids(start=None, end=None, owner=None):
+    available_ids = load_slot_store().available_ids()
+
+    # 📅 Skip slots that someone else has reserved for the requested window
+    start = start or datetime.now()
+    end = end or start + RESERVATION_HORIZON
+    return free_slots(available_ids, start, end, owner)
 
 def show_available_slots():
-    ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    available = df[df["Status"] == "Available"][["Slot_ID", "Level", "Type", "Max_Length", "Max_Width", "Max_Height"]]
+    df = load_slot_store().to_dataframe()
+    available = df[df["Status"] == AVAILABLE][["Slot_ID", "Level", "Type", "Max_Length", "Max_Width", "Max_Height"]]
     if available.empty:
         print("❌ No available slots right now.")
     else:
         print("🔓 Available Slots:\n")
         print(available.to_string(index=False))
 
-def update_slot(slot_id: str, status: str, vehicle: str, user_id: str):
-    df = pd.read_csv(SLOT_CSV)
-    
-    df["Status"] = df["Status"].astype(str)
-    df["Vehicle"] = df["Vehicle"].astype(str)
-    df["User_ID"] = df["User_ID"].astype(str)
-    
-    df.loc[df["Slot_ID"] == slot_id, ["Status", "Vehicle", "User_ID"]] = [status, vehicle, user_id]
-    df.to_csv(SLOT_CSV, index=False)
+def update_slot(slot_id: str, status: str, vehicle: str, user_id: str, defer_save: bool = False,
+                expected_status: Optional[str] = None) -> bool:
+    # Compare-and-set when expected_status is given: another writer may have taken the slot meanwhile.
+    # Only the shard that owns slot_id is locked.
+    store = load_slot_store()
+    previous = store.set_slot(slot_id, status, vehicle, user_id, expected_status)
+    if previous is None:
+        return False
+    if defer_save:
+        schedule_save(store)
+    else:
+        save_slot_store(store)
+
+    # 🗂️ Record the transition in the occupancy history and push it to the feed
+    level, slot_type = store.level_of(slot_id), store.type_of(slot_id)
+    if status == OCCUPIED and previous == AVAILABLE:
+        record_occupy(slot_id, level, slot_type)
+        FEED.publish(OCCUPY, slot_id, level, slot_type)
+    elif status == AVAILABLE and previous == OCCUPIED:
+        record_release(slot_id, level, slot_type)
+        FEED.publish(RELEASE, slot_id, level, slot_type)
+    return True
 
 def get_slot_level(slot_id: str) -> str:
-    df = pd.read_csv(SLOT_CSV)
-    level = df.loc[df["Slot_ID"] == slot_id, "Level"].values
-    return level[0] if len(level) else "Unknown"
+    return load_slot_store().level_of(slot_id)
 
 def release_expired_slots():
     if not os.path.exists(USER_CSV):
         return
-    df = pd.read_csv(USER_CSV)
+    df = read_csv(USER_CSV)
     now = datetime.now()
     changed = False
 
@@ -76,18 +160,20 @@ def release_expired_slots():
                     if pd.notna(slot) and slot:
                         print(f"⌛ Booking expired. Releasing slot {slot}.")
                         update_slot(slot, "Available", "", "")
+                        cancel(slot, owner=row.get("User_ID"))
                         df.at[index, "Prebooked"] = "No"
-                        df.at[index, "Prebooked_Slot"] = ""
-                        df.at[index, "Booking_Start"] = ""
-                        df.at[index, "Booking_End"] = ""
-                        df.at[index, "Duration_Hrs"] = ""
+                        # None, not "": pandas 3 rejects "" in the float/str booking columns
+                        df.at[index, "Prebooked_Slot"] = None
+                        df.at[index, "Booking_Start"] = None
+                        df.at[index, "Booking_End"] = None
+                        df.at[index, "Duration_Hrs"] = None
                         changed = True
             except Exception as e:
                 print(f"⚠️ Error parsing date: {e}")
                 continue
 
     if changed:
-        df.to_csv(USER_CSV, index=False)
+        write_csv(df, USER_CSV)
 
 # Quantum RL setup
 dev = qml.device("default.qubit", wires=3)
@@ -101,78 +187,102 @@ def qrl_circuit(params):
     qml.CNOT(wires=[1, 2])
     return qml.probs(wires=[0, 1, 2])
 
-def choose_slot_quantum(slots, car_dims):
-    scores = []
-    for _, row in slots.iterrows():
-        d_length = abs(row["Max_Length"] - car_dims["length"])
-        d_width = abs(row["Max_Width"] - car_dims["width"])
-        d_height = abs(row["Max_Height"] - car_dims["height"])
-        params = [
-            np.pi * d_length / 6,
-            np.pi * d_width / 3,
-            np.pi * d_height / 3
-        ]
-        probs = qrl_circuit(params)
-        match_score = probs[0]  # Probability of |000⟩ = best match
-        scores.append(match_score)
-
-    slots["QRL_Score"] = scores
-    best_slot = slots.sort_values(by="QRL_Score", ascending=False).iloc[0]
-    return best_slot["Slot_ID"]
-
-def assign_slot(vehicle_number: str, user_id: str, role: str = "General") -> Optional[str]:
-    ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    available = df[df["Status"] == "Available"].copy()
+def choose_slot_quantum(ids, dims, car_dims):
+    needed = np.array([car_dims["length"], car_dims["width"], car_dims["height"]])
+    diffs = np.abs(dims.astype(np.float64) - needed)
+    all_params = np.pi * diffs / np.array([6, 3, 3])
 
-    if available.empty:
+    scores = []
+    for params in all_params:
+        with timer("parkour_qrl_circuit_seconds"):
+            probs = qrl_circuit(params)
+        scores.append(probs[0])  # Probability of |000⟩ = best match
+
+    return str(ids[int(np.argmax(scores))])
+
+def assign_slot(vehicle_number: str, user_id: str, role: str = "General",
+                car_type: Optional[str] = None, preferred_slot: Optional[str] = None,
+                start: Optional[datetime] = None, end: Optional[datetime] = None,
+                reserve_window: bool = False) -> Optional[str]:
+    # start/end: the stay to check against the calendar (default: now + RESERVATION_HORIZON).
+    # reserve_window: hold that window on the slot before claiming it (shift bookings)
+    if not load_slot_store().free_count():
         print("🚫 No slots available at the moment.")
         return None
 
-    print("\n🚗 Choose your car type:")
-    for idx, t in enumerate(CAR_DIMENSIONS.keys()):
-        print(f"{idx+1}. {t}")
-    choice = int(input("Enter choice (1–4): "))
-    car_type = list(CAR_DIMENSIONS.keys())[choice - 1]
+    if car_type not in CAR_DIMENSIONS:
+        # 🔎 Registered plates already know their vehicle type
+        match = lookup_plate(vehicle_number)
+        if match and match["car_type"] in CAR_DIMENSIONS:
+            car_type = match["car_type"]
+            print(f"🚗 Registered {match['vehicle_type']} ({match['plate']}) → {car_type}")
+    if car_type not in CAR_DIMENSIONS:
+        print("\n🚗 Choose your car type:")
+        for idx, t in enumerate(CAR_DIMENSIONS.keys()):
+            print(f"{idx+1}. {t}")
+        choice = int(input("Enter choice (1–4): "))
+        car_type = list(CAR_DIMENSIONS.keys())[choice - 1]
     car_dims = CAR_DIMENSIONS[car_type]
 
-    suitable = available[
-        (available["Max_Length"] >= car_dims["length"]) &
-        (available["Max_Width"] >= car_dims["width"]) &
-        (available["Max_Height"] >= car_dims["height"])
-    ]
+    # 🔒 Pick across the shards, then claim on the owning shard only if still Available;
+    # a lost race re-picks from the fresh state
+    skipped = set()
+    while True:
+        store = load_slot_store()
+        # ⏱️ Selection only: the car-type prompt and the CSV save stay out of the allocator histogram
+        with timer("parkour_allocator_seconds", allocator="qrl"):
+            ids, dims, _ = store.candidates(car_dims)
+
+            # 📅 Leave slots reserved by someone else over the stay alone
+            window_start = start or datetime.now()
+            window_end = end or window_start + RESERVATION_HORIZON
+            allowed = set(free_slots(ids.tolist(), window_start, window_end, user_id)) - skipped
+            keep = np.array([slot_id in allowed for slot_id in ids.tolist()], dtype=bool)
+            ids, dims = ids[keep], dims[keep]
+
+            if not len(ids):
+                selected_slot_id = None
+            elif preferred_slot in allowed:
+                selected_slot_id = preferred_slot
+            else:
+                selected_slot_id = choose_slot_quantum(ids, dims, car_dims)
+
+        if selected_slot_id is None:
+            print("❌ No slots can fit your vehicle’s dimensions.")
+            return None
+        # Reserve first, then claim; whichever step fails, undo the other and pick again
+        if reserve_window and not reserve(selected_slot_id, window_start, window_end, user_id):
+            skipped.add(selected_slot_id)
+        elif update_slot(selected_slot_id, "Occupied", vehicle_number, user_id, expected_status=AVAILABLE):
+            break
+        elif reserve_window:
+            cancel(selected_slot_id, owner=user_id, start=window_start)
+        preferred_slot = None
 
-    if suitable.empty:
-        print("❌ No slots can fit your vehicle’s dimensions.")
-        return None
-
-    selected_slot_id = choose_slot_quantum(suitable, car_dims)
-    update_slot(selected_slot_id, "Occupied", vehicle_number, user_id)
     level = get_slot_level(selected_slot_id)
     print(f"✅ Slot assigned (via QRL): {selected_slot_id} (Level: {level})")
     return selected_slot_id
 
 def release_slot(vehicle_number: str) -> Optional[str]:
-    ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    index = df[df["Vehicle"] == vehicle_number].index
+    slot_id = load_slot_store().find_vehicle(vehicle_number)
 
-    if index.empty:
+    if slot_id is None:
         print("⚠️ Vehicle not found in any occupied slot.")
         return None
 
-    slot_id = df.loc[index[0], "Slot_ID"]
-    update_slot(slot_id, "Available", "", "")
+    if not update_slot(slot_id, "Available", "", "", expected_status=OCCUPIED):
+        print("⚠️ Vehicle not found in any occupied slot.")
+        return None
     print(f"🔓 Slot {slot_id} is now available.")
     return slot_id
 
 def clear_all_slots():
-    ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    df["Status"] = "Available"
-    df["Vehicle"] = ""
-    df["User_ID"] = ""
-    df.to_csv(SLOT_CSV, index=False)
+    store = load_slot_store()
+    for slot_id in store.clear_all():
+        record_release(slot_id, store.level_of(slot_id), store.type_of(slot_id))
+    save_slot_store(store)
+    if FEED.seeded:
+        FEED.reset(store)
     print("🧹 All slots reset to Available.")
 
 def compute_dim_diff(slot, dims):
@@ -183,11 +293,7 @@ def compute_dim_diff(slot, dims):
     )
 
 def assign_slot_baseline(vehicle_number: str, user_id: str, role: str = "General") -> Optional[str]:
-    ensure_slot_csv()
-    df = pd.read_csv(SLOT_CSV)
-    available = df[df["Status"] == "Available"].copy()
-
-    if available.empty:
+    if not load_slot_store().free_count():
         print("🚫 No slots available at the moment (Baseline).")
         return None
 
@@ -198,19 +304,18 @@ def assign_slot_baseline(vehicle_number: str, user_id: str, role: str = "General
     car_type = list(CAR_DIMENSIONS.keys())[choice - 1]
     car_dims = CAR_DIMENSIONS[car_type]
 
-    suitable = available[
-        (available["Max_Length"] >= car_dims["length"]) &
-        (available["Max_Width"] >= car_dims["width"]) &
-        (available["Max_Height"] >= car_dims["height"])
-    ]
+    while True:
+        store = load_slot_store()
+        with timer("parkour_allocator_seconds", allocator="baseline"):
+            ids = store.candidates(car_dims)[0]
 
-    if suitable.empty:
-        print("❌ No slots fit your vehicle dimensions (Baseline).")
-        return None
+        if not len(ids):
+            print("❌ No slots fit your vehicle dimensions (Baseline).")
+            return None
 
-    selected_slot = suitable.iloc[0]
-    selected_slot_id = selected_slot["Slot_ID"]
-    update_slot(selected_slot_id, "Occupied", vehicle_number, user_id)
+        selected_slot_id = str(ids[0])
+        if update_slot(selected_slot_id, "Occupied", vehicle_number, user_id, expected_status=AVAILABLE):
+            break
     level = get_slot_level(selected_slot_id)
     print(f"✅ Slot assigned (Baseline): {selected_slot_id} (Level: {level})")
     return selected_slot_id
@@ -0,0 +1,139 @@
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from metrics import read_csv, timer, inc
+
+CACHE_DIR = ".parkour_cache"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 2
+
+# 📦 Binary snapshots of the CSV datasets: one .npy per column + a manifest
+# holding the source size/mtime/sha256. Columns load with mmap_mode="r", so
+# worker processes share the same pages read-only instead of re-parsing.
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def snapshot_dir(csv_path, cache_dir=CACHE_DIR):
+    source = os.path.abspath(csv_path)
+    tag = hashlib.sha256(source.encode()).hexdigest()[:10]
+    return os.path.join(cache_dir, f"{os.path.basename(source)}.{tag}")
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        return manifest if manifest.get("version") == FORMAT_VERSION else None
+    except (OSError, ValueError):
+        return None
+
+def _is_current(manifest, csv_path, target):
+    if manifest is None:
+        return False
+    stat = os.stat(csv_path)
+    if manifest["size"] == stat.st_size and manifest["mtime_ns"] == stat.st_mtime_ns:
+        return True
+    # Touched but maybe not changed: fall back to the content hash
+    if manifest["size"] == stat.st_size and manifest["sha256"] == _file_sha256(csv_path):
+        manifest["mtime_ns"] = stat.st_mtime_ns
+        with open(os.path.join(target, MANIFEST), "w") as f:
+            json.dump(manifest, f)
+        return True
+    return False
+
+def build_snapshot(csv_path, cache_dir=CACHE_DIR):
+    target = snapshot_dir(csv_path, cache_dir)
+    stat = os.stat(csv_path)
+    sha = _file_sha256(csv_path)
+
+    with timer("parkour_snapshot_build_seconds", file=os.path.basename(csv_path)):
+        df = read_csv(csv_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".build_", dir=cache_dir)
+        columns = []
+        for i, name in enumerate(df.columns):
+            series = df[name]
+            entry = {"name": name, "file": f"{i:03d}.npy", "nulls": None}
+            nulls = series.isna().to_numpy()
+            if series.dtype.kind in "biufM":
+                values = series.to_numpy()
+            else:
+                if len(series.dropna()) and series.dropna().map(type).eq(bool).all():
+                    # True/False column with blanks: stays boolean
+                    values = series.where(~nulls, False).astype(bool).to_numpy()
+                else:
+                    # Text: fixed-width unicode so it can be memory-mapped
+                    values = series.where(~nulls, "").astype(str).to_numpy(dtype=str)
+                if nulls.any():
+                    # Null mask so NaN round-trips
+                    entry["nulls"] = f"{i:03d}.nulls.npy"
+                    np.save(os.path.join(tmp, entry["nulls"]), nulls)
+            np.save(os.path.join(tmp, entry["file"]), values)
+            columns.append(entry)
+
+        manifest = {
+            "version": FORMAT_VERSION,
+            "source": os.path.abspath(csv_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha,
+            "rows": len(df),
+            "columns": columns
+        }
+        with open(os.path.join(tmp, MANIFEST), "w") as f:
+            json.dump(manifest, f)
+
+        if os.path.exists(target):
+            shutil.rmtree(target, ignore_errors=True)
+        try:
+            os.replace(tmp, target)
+        except OSError:
+            # Another process published the same snapshot first
+            shutil.rmtree(tmp, ignore_errors=True)
+    inc("parkour_snapshot_builds_total", file=os.path.basename(csv_path))
+    return target, manifest
+
+def _ensure_snapshot(csv_path, cache_dir):
+    target = snapshot_dir(csv_path, cache_dir)
+    manifest = _read_manifest(target)
+    if _is_current(manifest, csv_path, target):
+        inc("parkour_snapshot_hits_total", file=os.path.basename(csv_path))
+        return target, manifest
+    return build_snapshot(csv_path, cache_dir)
+
+def load_columns(csv_path, cache_dir=CACHE_DIR):
+    # Read-only memory-mapped columns (no copy) plus null masks for text columns
+    target, manifest = _ensure_snapshot(csv_path, cache_dir)
+    columns, nulls = {}, {}
+    for entry in manifest["columns"]:
+        columns[entry["name"]] = np.load(os.path.join(target, entry["file"]), mmap_mode="r")
+        if entry["nulls"]:
+            nulls[entry["name"]] = np.load(os.path.join(target, entry["nulls"]), mmap_mode="r")
+    return columns, nulls
+
+def load_frame(csv_path, cache_dir=CACHE_DIR):
+    # Same columns and values as pd.read_csv(csv_path); text comes back as object dtype
+    # (pandas 3 read_csv gives str). Meant for read-mostly datasets: each rewrite costs a rebuild
+    with timer("parkour_snapshot_load_seconds", file=os.path.basename(csv_path)):
+        columns, nulls = load_columns(csv_path, cache_dir)
+        data = {}
+        for name, values in columns.items():
+            if values.dtype.kind == "U" or name in nulls:
+                series = pd.Series(values, dtype=object)
+                if name in nulls:
+                    series[np.asarray(nulls[name])] = np.nan
+                data[name] = series
+            else:
+                data[name] = pd.Series(np.asarray(values))
+        return pd.DataFrame(data)
+
+def clear_snapshots(cache_dir=CACHE_DIR):
+    shutil.rmtree(cache_dir, ignore_errors=True)
@@ -1,51 +1,67 @@
 import pandas as pd
 import hashlib
 import os
+from metrics import read_csv, write_csv, timer, inc
 
 USER_CSV = "user_authentication_dataset.csv"
+USER_COLUMNS = [
+    "User_ID", "Name", "Phone", "Email", "Password_Hash", "IsActive",
+    "Slot", "VehicleNumber", "VehicleType", "IsElectric", "Role", "CheckIn", "CheckOut", "Notes",
+    "Prebooked", "Prebooked_Slot", "Booking_Start", "Booking_End", "Duration_Hrs"
+]
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
-def login_user():
-    email = input("📧 Email: ").strip().lower()  # Normalize email
-    password = input("🔐 Password: ").strip()
+def _ask(value, prompt):
+    # Prompt only when the caller (e.g. the simulator) didn't supply a value
+    return (value if value is not None else input(prompt)).strip()
+
+def login_user(email=None, password=None):
+    email = _ask(email, "📧 Email: ").lower()  # Normalize email
+    password = _ask(password, "🔐 Password: ")
     
     if not os.path.exists(USER_CSV):
         print("⚠️ No users registered yet.")
         return None
 
     try:
-        df = pd.read_csv(USER_CSV)
-        # Normalize email column for case-insensitive comparison
-        df["Email"] = df["Email"].str.lower()
-        user = df[df["Email"] == email]
+        with timer("parkour_login_seconds"):
+            df = read_csv(USER_CSV)
+            # Normalize email column for case-insensitive comparison
+            df["Email"] = df["Email"].str.lower()
+            user = df[df["Email"] == email]
+            matched = not user.empty and user.iloc[0]["Password_Hash"] == hash_password(password)
 
-        if not user.empty and user.iloc[0]["Password_Hash"] == hash_password(password):
+        if matched:
+            inc("parkour_logins_total", result="success")
             return user.iloc[0].to_dict()
     except Exception as e:
         print(f"⚠️ Error during login: {e}")
 
+    inc("parkour_logins_total", result="failure")
     print("❌ Invalid email or password.")
     return None
 
-def register_user():
-    name = input("👤 Name: ").strip()
-    phone = input("📱 Phone: ").strip()
-    email = input("📧 Email: ").strip().lower()  # Normalize email
-    password = input("🔐 Password: ").strip()
-    role = input("🔧 Role (user/official/intern/worker): ").strip().lower()
-
-    df = pd.read_csv(USER_CSV) if os.path.exists(USER_CSV) else pd.DataFrame(columns=[
-        "User_ID", "Name", "Phone", "Email", "Password_Hash", "IsActive",
-        "Slot", "VehicleNumber", "VehicleType", "IsElectric", "Role", "CheckIn", "CheckOut", "Notes"
-    ])
-    
+def register_user(name=None, phone=None, email=None, password=None, role=None):
+    name = _ask(name, "👤 Name: ")
+    phone = _ask(phone, "📱 Phone: ")
+    email = _ask(email, "📧 Email: ").lower()  # Normalize email
+    password = _ask(password, "🔐 Password: ")
+    role = _ask(role, "🔧 Role (user/official/intern/worker): ").lower()
+
+    df = read_csv(USER_CSV) if os.path.exists(USER_CSV) else pd.DataFrame(columns=USER_COLUMNS)
+    for column in USER_COLUMNS:
+        if column not in df.columns:
+            df[column] = ""
+
     new_id = f"user_{len(df) + 1}"
-    df.loc[len(df)] = [
-        new_id, name, phone, email, hash_password(password), "Yes",
-        "", "", "", "", role, "", "", ""
-    ]
-    df.to_csv(USER_CSV, index=False)
+    # Filled by column name: save_booking and other writers may have added columns
+    row = {
+        "User_ID": new_id, "Name": name, "Phone": phone, "Email": email,
+        "Password_Hash": hash_password(password), "IsActive": "Yes", "Role": role
+    }
+    df.loc[len(df)] = [row.get(column, "") for column in df.columns]
+    write_csv(df, USER_CSV)
     print("✅ Registered successfully!")
     return df[df["User_ID"] == new_id].iloc[0].to_dict()
\ No newline at end of file
@@ -1,5 +1,8 @@
 import pandas as pd
 from datetime import datetime
+from billing import ROLE_RATE, price_session
+from reservations import reserve
+from metrics import read_csv, write_csv
 
 USER_CSV = "user_authentication_dataset.csv"
 SLOT_CSV = "updated_parking_slots_dataset.csv"
@@ -12,16 +15,8 @@ ROLE_PRIORITY = {
     "guest": 5
 }
 
-ROLE_RATE = {
-    "official": 30,
-    "worker": 40,
-    "intern": 50,
-    "user": 60,
-    "guest": 70
-}
-
 def assign_slot(vehicle_number, user_id, role):
-    df = pd.read_csv(SLOT_CSV)
+    df = read_csv(SLOT_CSV)
     available = df[df["Status"].str.lower() == "available"]
 
     if available.empty:
@@ -34,32 +29,25 @@ def assign_slot(vehicle_number, user_id, role):
     selected_slot = available.iloc[0]["Slot_ID"] if not available.empty else "None"
 
     df.loc[df["Slot_ID"] == selected_slot, ["Status", "Vehicle", "User_ID"]] = ["Occupied", vehicle_number, user_id]
-    df.to_csv(SLOT_CSV, index=False)
+    write_csv(df, SLOT_CSV)
     return selected_slot
 
-def calculate_bill(start_time_str, end_time_str, role):
-    from datetime import datetime
-
-    start = datetime.strptime(start_time_str, "%Y-%m-%d %H:%M:%S")
-    end = datetime.strptime(end_time_str, "%Y-%m-%d %H:%M:%S")
-    total_minutes = (end - start).total_seconds() / 60
-
-    hourly_rate = {
-        "guest": 60,
-        "user": 60,
-        "official": 30,
-        "worker": 30,
-        "intern": 40
-    }
+def calculate_bill(start_time, end_time, role):
+    # Accepts datetimes or "%Y-%m-%d %H:%M:%S" strings; priced by the billing tariff
+    return price_session(start_time, end_time, role)
 
-    rate = hourly_rate.get(role, 60)
-    total_bill = (total_minutes / 60) * rate
-    return round(total_bill, 2)
 
+def save_booking(user_id, slot, start, end, duration, reserved=False):
+    # reserved=True: the caller already holds the calendar entry (assign_slot(reserve_window=True))
+    start, end = pd.to_datetime(start).to_pydatetime(), pd.to_datetime(end).to_pydatetime()
+    if not reserved and not reserve(slot, start, end, user_id):
+        print(f"❌ Slot {slot} is already reserved during that time.")
+        return False
 
-def save_booking(user_id, slot, start, end, duration):
-    df = pd.read_csv(USER_CSV)
+    # Stored as text in the format release_expired_slots parses
+    df = read_csv(USER_CSV, dtype={"Prebooked_Slot": str, "Booking_Start": str, "Booking_End": str})
     df.loc[df["User_ID"] == user_id, ["Prebooked", "Prebooked_Slot", "Booking_Start", "Booking_End", "Duration_Hrs"]] = [
-        "Yes", slot, start, end, duration
+        "Yes", slot, start.strftime("%Y-%m-%d %H:%M:%S"), end.strftime("%Y-%m-%d %H:%M:%S"), duration
     ]
-    df.to_csv(USER_CSV, index=False)
+    write_csv(df, USER_CSV)
+    return True